@@ -0,0 +1,138 @@
+"""
+Décodeur Ethernet en ligne de commande : décodage par lots
+
+Décode toutes les captures CSV d'un répertoire (ou désignées par un motif
+glob) en répartissant les fichiers sur un pool de processus, et écrit un
+résultat JSON par capture et par ligne (JSON lines). Le décodage utilise
+le même cœur que l'application web (decodeurManchester, decodeurEthernet).
+
+Usage:
+    python app.py captures/                            # tous les .csv du répertoire
+    python app.py "captures/*.csv" -o resultats.jsonl  # motif glob, sortie dans un fichier
+    python app.py captures/ -j 4 --debit 10e6 --rejeter-fcs-errone
+    python app.py captures/ --dissection                # couches VLAN/ARP/IP/TCP/UDP de chaque trame
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time as chrono
+from multiprocessing import Pool
+from pathlib import Path
+
+from lecteurCSVOscillo import LecteurCSVOscillo
+from decodeurManchester import decode_manchester, segment_frames
+from decodeurEthernet import decode_frames, frames_to_bytes, json_default
+
+
+def lister_captures(motifs):
+    """Fichiers CSV désignés par des répertoires, des motifs glob ou des chemins"""
+    fichiers = []
+    for motif in motifs:
+        if os.path.isdir(motif):
+            fichiers.extend(sorted(str(p) for p in Path(motif).glob('*.csv')))
+        else:
+            fichiers.extend(sorted(glob.glob(motif, recursive=True)))
+    return list(dict.fromkeys(fichiers))  # Sans doublons, ordre conservé
+
+
+def decoder_capture(chemin, debit=10e6, frequence=None, rejeter_fcs_errone=False, dissection=False):
+    """
+    Décode une capture (exécuté dans un processus du pool).
+
+    Returns:
+        dict sérialisable en JSON : fichier, échantillons, bits, trames
+        décodées et bilan des FCS, ou message d'erreur
+    """
+    debut = chrono.perf_counter()
+    try:
+        lecteur = LecteurCSVOscillo(chemin)
+        signal, intervalle = lecteur.charger_donnees()
+        frequence = frequence or 1.0 / intervalle
+        decoded = decode_manchester(signal, lecteur.temps, frequence, debit)
+        spans = segment_frames(decoded, lecteur.temps, frequence, debit)
+        frames, fcs_summary = decode_frames(frames_to_bytes(decoded['bits'], spans), spans,
+                                            rejeter_fcs_errone, dissect=dissection)
+        return {
+            'file': chemin,
+            'num_samples': len(signal),
+            'sample_rate': frequence,
+            'num_bits': decoded['num_bits'],
+            'frames': frames,
+            'fcs_summary': fcs_summary,
+            'elapsed': round(chrono.perf_counter() - debut, 6)
+        }
+    except Exception as e:
+        return {'file': chemin, 'error': str(e), 'elapsed': round(chrono.perf_counter() - debut, 6)}
+
+
+def _decoder_capture_args(args):
+    return decoder_capture(*args)
+
+
+def decoder_lot(fichiers, sortie, processus=None, debit=10e6, frequence=None,
+                rejeter_fcs_errone=False, dissection=False):
+    """
+    Décode une liste de captures sur un pool de processus ; chaque résultat
+    est écrit dans sortie (une ligne JSON) dès qu'il est disponible.
+
+    Returns:
+        dict des totaux : fichiers, erreurs, échantillons, trames, durée (s)
+    """
+    totaux = {'fichiers': 0, 'erreurs': 0, 'echantillons': 0, 'trames': 0}
+    debut = chrono.perf_counter()
+    taches = [(chemin, debit, frequence, rejeter_fcs_errone, dissection) for chemin in fichiers]
+    with Pool(processus or os.cpu_count()) as pool:
+        for resultat in pool.imap_unordered(_decoder_capture_args, taches):
+            sortie.write(json.dumps(resultat, default=json_default) + '\n')
+            totaux['fichiers'] += 1
+            if 'error' in resultat:
+                totaux['erreurs'] += 1
+            else:
+                totaux['echantillons'] += resultat['num_samples']
+                totaux['trames'] += len(resultat['frames'])
+    totaux['duree'] = chrono.perf_counter() - debut
+    return totaux
+
+
+def afficher_debits(totaux):
+    """Affiche les débits du lot sur la sortie d'erreur (la sortie standard peut contenir les résultats)"""
+    duree = totaux['duree'] or 1e-9
+    print(f"{totaux['fichiers']} fichiers ({totaux['erreurs']} en erreur) en {totaux['duree']:.2f} s : "
+          f"{totaux['fichiers'] / duree:.2f} fichiers/s, "
+          f"{totaux['echantillons'] / duree:,.0f} échantillons/s, "
+          f"{totaux['trames'] / duree:.1f} trames/s", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Décodage par lots de captures Ethernet (CSV d'oscilloscope)")
+    parser.add_argument('captures', nargs='+', help='répertoires, motifs glob ou fichiers CSV')
+    parser.add_argument('-o', '--sortie', help='fichier JSON lines de sortie (sortie standard par défaut)')
+    parser.add_argument('-j', '--processus', type=int, help='nombre de processus (nombre de cœurs par défaut)')
+    parser.add_argument('--debit', type=float, default=10e6, help='débit en bits/s (10e6 par défaut)')
+    parser.add_argument('--frequence', type=float,
+                        help="fréquence d'échantillonnage en Hz (déduite de la capture par défaut)")
+    parser.add_argument('--rejeter-fcs-errone', action='store_true',
+                        help='ne pas écrire les trames dont le FCS est erroné')
+    parser.add_argument('--dissection', action='store_true',
+                        help='disséquer entièrement chaque trame (VLAN, ARP, IP, ICMP, UDP, TCP)')
+    args = parser.parse_args(argv)
+
+    fichiers = lister_captures(args.captures)
+    if not fichiers:
+        parser.error('aucune capture CSV trouvée')
+
+    sortie = open(args.sortie, 'w', encoding='utf-8') if args.sortie else sys.stdout
+    try:
+        totaux = decoder_lot(fichiers, sortie, args.processus, args.debit, args.frequence,
+                             args.rejeter_fcs_errone, args.dissection)
+    finally:
+        if args.sortie:
+            sortie.close()
+    afficher_debits(totaux)
+    return 1 if totaux['erreurs'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
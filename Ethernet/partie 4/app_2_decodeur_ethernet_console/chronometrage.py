@@ -0,0 +1,179 @@
+"""
+Module de mesure des étapes du décodage
+
+Les étapes du décodage (lecture du CSV, seuillage, détection des fronts,
+décodage des bits, découpage en trames...) sont délimitées par
+stage(nom) :
+
+    with stage('edges', samples=len(signal)):
+        all_edges = np.flatnonzero(digital[1:] != digital[:-1])
+
+Les mesures (durée, nombre d'échantillons traités et, en mode profilage,
+pic d'allocation mémoire via tracemalloc) sont cumulées par nom d'étape
+dans l'enregistreur actif du contexte courant (un par requête dans
+l'application Flask, voir recording). Sans enregistreur actif, stage()
+retourne un contexte vide partagé : la mesure ne coûte qu'une lecture de
+ContextVar.
+
+Les étapes ne s'imbriquent pas : une étape commencée dans une autre est
+comptée deux fois dans la durée totale. Une même étape exécutée en
+parallèle dans plusieurs threads (voies d'une capture) cumule les durées
+de chaque thread.
+
+Le pic d'allocation de tracemalloc est global au processus : les étapes
+profilées s'exécutent donc une à la fois (verrou commun à tous les
+enregistreurs), sinon chacune remettrait à zéro le pic des autres. En
+mode profilage, les voies d'une capture ne sont plus décodées en
+parallèle pendant ces étapes, et le pic d'une étape compte aussi les
+allocations faites au même moment par les requêtes non profilées : c'est
+un majorant, pas une mesure exacte sous charge.
+"""
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_recorder = ContextVar('stage_recorder', default=None)
+
+# Nombre d'enregistreurs en mode profilage : tracemalloc, global au
+# processus, est actif tant qu'il en reste au moins un (s'il n'était pas
+# déjà démarré par ailleurs)
+_profiling = 0
+_started_tracing = False
+_profiling_lock = threading.Lock()
+# Une seule étape profilée à la fois (pic tracemalloc partagé) ; réentrant
+# pour qu'une étape imbriquée dans le même thread ne bloque pas
+_peak_lock = threading.RLock()
+
+
+class StageTiming:
+    """Mesures cumulées d'une étape"""
+    __slots__ = ('name', 'seconds', 'calls', 'samples', 'peak_bytes')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.samples = 0
+        self.peak_bytes = None
+
+
+class StageRecorder:
+    """
+    Mesures des étapes d'un traitement, par nom d'étape dans l'ordre de
+    première exécution. profile : mesurer aussi le pic d'allocation de
+    chaque étape (tracemalloc, coûteux).
+    """
+
+    def __init__(self, profile=False):
+        self.profile = profile
+        self.stages = {}
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def timing(self, name):
+        timing = self.stages.get(name)
+        if timing is None:
+            timing = self.stages[name] = StageTiming(name)
+        return timing
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+class _Stage:
+    __slots__ = ('recorder', 'name', 'samples', 'start', 'memory')
+
+    def __init__(self, recorder, name, samples):
+        self.recorder = recorder
+        self.name = name
+        self.samples = samples
+
+    def __enter__(self):
+        if self.recorder.profile:
+            _peak_lock.acquire()
+            tracemalloc.reset_peak()
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if self.recorder.profile:
+            try:
+                peak = tracemalloc.get_traced_memory()[1] - self.memory
+            finally:
+                _peak_lock.release()
+        with self.recorder.lock:
+            timing = self.recorder.timing(self.name)
+            timing.seconds += seconds
+            timing.calls += 1
+            if self.samples:
+                timing.samples += self.samples
+            if self.recorder.profile:
+                timing.peak_bytes = max(peak, timing.peak_bytes or 0)
+        return False
+
+
+class _NoStage:
+    """Contexte vide (aucun enregistreur actif) ; les affectations (samples) sont ignorées"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name, samples=None):
+    """Contexte mesurant l'étape name (samples : nombre d'échantillons traités)"""
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NO_STAGE
+    return _Stage(recorder, name, samples)
+
+
+def start_recording(profile=False):
+    """
+    Active un nouvel enregistreur dans le contexte courant ; retourne
+    (enregistreur, jeton) à passer à stop_recording
+    """
+    global _profiling, _started_tracing
+    recorder = StageRecorder(profile)
+    if profile:
+        with _profiling_lock:
+            _profiling += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+    return recorder, _recorder.set(recorder)
+
+
+def stop_recording(recorder, token):
+    """Désactive l'enregistreur activé par start_recording"""
+    global _profiling, _started_tracing
+    _recorder.reset(token)
+    if recorder.profile:
+        with _profiling_lock:
+            _profiling -= 1
+            if _profiling == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+
+@contextmanager
+def recording(profile=False):
+    """Enregistre les étapes exécutées dans le bloc ; produit l'enregistreur"""
+    recorder, token = start_recording(profile)
+    try:
+        yield recorder
+    finally:
+        stop_recording(recorder, token)
@@ -0,0 +1,274 @@
+"""
+Module contenant le décodage des trames Ethernet
+
+Cœur du décodage partagé par l'application console (décodage par lots) et
+l'application web Flask : conversion des bits en octets, vérification du
+FCS (CRC-32) et extraction des champs de chaque trame. Les couches
+supérieures (VLAN, ARP, IP, TCP...) sont disséquées à la demande par
+dissecteurProtocoles.
+"""
+import os
+import zlib
+from functools import partial
+
+import numpy as np
+
+from dissecteurProtocoles import ETHERNET_HEADER, dissect_frame, ethertype_name
+
+FRAME_POOL_MIN_FRAMES = 256  # En dessous, décodage des trames sans pool de processus
+PAYLOAD_PREVIEW = 32  # Octets de données conservés pour l'affichage
+PREAMBLE_MIN_BITS = 16  # Bits alternés (1010...) exigés avant la fin du SFD (...11)
+
+
+class HexBytes(bytes):
+    """
+    Octets d'un champ de trame, convertis en texte hexadécimal seulement à
+    la sérialisation (str, JSON) : 'AA BB CC', suivi de '...' si le champ
+    a été tronqué (truncated).
+    """
+    sep = ' '
+
+    def __new__(cls, data, truncated=False):
+        field = super().__new__(cls, data)
+        field.truncated = truncated
+        return field
+
+    def __str__(self):
+        text = self.hex(self.sep).upper()
+        return text + '...' if self.truncated else text
+
+    def __reduce__(self):
+        # Transmis entre processus (pool) avec l'attribut truncated
+        return type(self), (bytes(self), self.truncated)
+
+
+class MacAddress(HexBytes):
+    """Adresse MAC, sérialisée sous la forme 'AA:BB:CC:DD:EE:FF'"""
+    sep = ':'
+
+
+def json_default(obj):
+    """Sérialisation JSON des champs formatés à la demande : json.dumps(..., default=json_default)"""
+    if isinstance(obj, HexBytes):
+        return str(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def bits_to_bytes(bits):
+    """
+    Convertit des bits (tableau NumPy ou liste) en bytes, bit de poids
+    faible en premier (ordre de transmission Ethernet). Un octet final
+    incomplet est ignoré.
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    return np.packbits(bits[:len(bits) // 8 * 8], bitorder='little').tobytes()
+
+
+def find_sfd(bytes_data):
+    """Indice du Start Frame Delimiter (0xD5, ou 0xAB = 0xD5 inversé), ou None"""
+    found = [i for i in (bytes_data.find(0xD5), bytes_data.find(0xAB)) if i >= 0]
+    return min(found) if found else None
+
+
+def find_sfd_bits(bits, min_preamble_bits=PREAMBLE_MIN_BITS):
+    """
+    Cherche le motif préambule + SFD (1010...1011 dans l'ordre de
+    transmission) à n'importe quel décalage binaire, en une passe
+    vectorisée sur tout le flux : un SFD est la fin d'une plage d'au moins
+    min_preamble_bits bits alternés, terminée par un 1 suivi d'un second 1.
+
+    Returns:
+        (data_starts, preamble_starts) : pour chaque SFD trouvé, indice du
+        premier bit qui le suit (MAC destination) et indice du premier bit
+        de la plage alternée qui le précède (tableaux triés)
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    if len(bits) < min_preamble_bits + 1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # same[k] : le bit k+1 répète le bit k (fin d'une plage alternée)
+    same = bits[1:] == bits[:-1]
+    indices = np.arange(len(bits))
+    run_starts = np.maximum.accumulate(np.where(np.concatenate(([True], same)), indices, 0))
+
+    # Deux 1 consécutifs (bits j-1 et j) terminant une plage alternée assez longue
+    ends = np.flatnonzero(same & (bits[1:] == 1)) + 1
+    preamble_starts = run_starts[ends - 1]
+    found = ends - preamble_starts >= min_preamble_bits
+    return ends[found] + 1, preamble_starts[found]
+
+
+def aligned_frame_bytes(bits, start, end, sfd_bits):
+    """
+    Octets d'une trame (bits start à end exclu) réalignés sur le premier SFD
+    trouvé par find_sfd_bits dans la trame : le SFD et les octets entiers de
+    préambule qui le précèdent deviennent des octets 0xD5 et 0x55. Sans SFD,
+    les bits sont groupés depuis start.
+    """
+    data_starts, preamble_starts = sfd_bits
+    i = np.searchsorted(data_starts, start + 8)
+    if i == len(data_starts) or data_starts[i] > end:
+        return bits_to_bytes(bits[start:end])
+    sfd = int(data_starts[i]) - 8
+    preamble_bytes = (sfd - max(int(preamble_starts[i]), start)) // 8
+    return bits_to_bytes(bits[sfd - 8 * preamble_bytes:end])
+
+
+def frame_start(bytes_data):
+    """Indice du premier octet de la trame (après le SFD, 0 si SFD absent)"""
+    sfd = find_sfd(bytes_data)
+    return 0 if sfd is None else sfd + 1
+
+
+def check_fcs(bytes_data, start=0):
+    """
+    Vérifie le FCS d'une trame : les 4 derniers octets doivent être le
+    CRC-32 IEEE 802.3 (zlib.crc32) des octets depuis start (MAC destination)
+    jusqu'à la fin des données, transmis octet de poids faible en premier.
+    """
+    if len(bytes_data) - start < 18:  # En-tête (14 octets) + FCS (4 octets)
+        return False
+    view = memoryview(bytes_data)
+    fcs = int.from_bytes(view[-4:], 'little')
+    return zlib.crc32(view[start:-4]) == fcs
+
+
+def validate_fcs_batch(frames_bytes):
+    """
+    Vérifie le FCS d'un lot de trames (bytes, préambule compris)
+    
+    Returns:
+        dict avec 'fcs_valid' (tableau NumPy de booléens, un par trame),
+        'valid' et 'invalid' (nombre de trames correctes et erronées)
+    """
+    fcs_valid = np.fromiter((check_fcs(data, frame_start(data)) for data in frames_bytes),
+                            dtype=bool, count=len(frames_bytes))
+    valid = int(np.count_nonzero(fcs_valid))
+    return {'fcs_valid': fcs_valid, 'valid': valid, 'invalid': len(frames_bytes) - valid}
+
+
+def decode_ethernet_frame(bytes_data, fcs_valid=None, dissect=False, depth=None):
+    """
+    Décode une trame Ethernet (fcs_valid : résultat déjà connu de la
+    vérification du FCS, recalculé si None).
+    
+    Par défaut seul l'en-tête Ethernet est lu (résumé pour la liste des
+    trames) ; avec dissect, la trame est disséquée : aperçu des données et
+    couches supérieures ('layers', au plus depth couches, toutes si None).
+    
+    Structure trame Ethernet II:
+    - Préambule: 7 octets (0x55) + SFD: 1 octet (0xD5)
+    - MAC destination: 6 octets
+    - MAC source: 6 octets
+    - Type/Longueur: 2 octets
+    - Données: 46-1500 octets
+    - FCS (CRC): 4 octets
+    """
+    if len(bytes_data) < 14:
+        return None
+    
+    frame = {}
+    
+    # Chercher le Start Frame Delimiter (SFD = 0xD5 = 0b11010101)
+    sfd = find_sfd(bytes_data)
+    if sfd is not None:
+        frame['preamble_end'] = sfd
+        idx = sfd + 1
+    else:
+        # Pas de SFD trouvé, supposer qu'on commence après le préambule
+        idx = 0
+    
+    if idx + 14 > len(bytes_data):
+        return None
+    
+    # Vérification du FCS (CRC-32) sur les octets qui suivent le SFD
+    frame['fcs_valid'] = check_fcs(bytes_data, idx) if fcs_valid is None else bool(fcs_valid)
+    
+    # En-tête lu sur une vue mémoire (sans copie de la trame) ; les MAC ne
+    # sont converties en texte qu'à la sérialisation
+    view = memoryview(bytes_data)
+    dest_mac, src_mac, ethertype = ETHERNET_HEADER.unpack_from(view, idx)
+    frame['dest_mac'] = MacAddress(dest_mac)
+    frame['src_mac'] = MacAddress(src_mac)
+    frame['ethertype'] = ethertype
+    frame['ethertype_hex'] = f'0x{ethertype:04X}'
+    idx += ETHERNET_HEADER.size
+    
+    # Identifier le protocole (table des EtherTypes)
+    frame['protocol'] = ethertype_name(ethertype)
+    
+    payload_length = len(bytes_data) - idx - 4  # -4 pour le FCS
+    if payload_length > 0:
+        frame['payload_length'] = payload_length
+    
+    if dissect:
+        # Aperçu des premiers octets de données et couches supérieures
+        if payload_length > 0:
+            frame['payload'] = HexBytes(view[idx:idx + min(PAYLOAD_PREVIEW, payload_length)],
+                                        truncated=payload_length > PAYLOAD_PREVIEW)
+        frame['layers'] = dissect_frame(bytes_data, idx - ETHERNET_HEADER.size).to_list(depth)
+    
+    # FCS (4 derniers octets)
+    frame['fcs'] = HexBytes(view[-4:])
+    
+    frame['total_length'] = len(bytes_data)
+    
+    return frame
+
+
+def decode_frame_bytes(frames, dissect=False):
+    """Décode une liste de trames (octets, FCS déjà vérifié) ; exécuté dans le pool de processus"""
+    return [decode_ethernet_frame(bytes_data, fcs_valid, dissect) for bytes_data, fcs_valid in frames]
+
+
+def frames_to_bytes(bits, spans):
+    """
+    Octets de chaque trame délimitée par la segmentation, réalignés sur le
+    SFD (recherché en une seule passe sur tout le flux de bits)
+    """
+    sfd_bits = find_sfd_bits(bits)
+    return [aligned_frame_bytes(bits, start, end, sfd_bits) for start, end, _, _ in spans]
+
+
+def decode_frames(frames_bytes, spans, drop_bad_fcs=False, get_pool=None, dissect=False):
+    """
+    Décode séparément chaque trame (octets donnés par frames_to_bytes) ;
+    seul l'en-tête Ethernet est lu, sauf avec dissect (dissection complète
+    de chaque trame, voir decode_ethernet_frame). Le FCS de toutes les trames est vérifié
+    en un seul lot avant le décodage ; avec drop_bad_fcs, les trames
+    erronées sont écartées dès cette étape. Au-delà de FRAME_POOL_MIN_FRAMES
+    trames, le décodage est réparti par lots sur le pool de processus
+    retourné par get_pool (appelée seulement dans ce cas ; décodage dans le
+    processus courant si None).
+    
+    Returns:
+        (frames, fcs_summary) : liste de dicts (trame décodée + index et
+        instants de début/fin) et nombre de trames au FCS correct/erroné
+    """
+    fcs = validate_fcs_batch(frames_bytes)
+    fcs_summary = {'valid': fcs['valid'], 'invalid': fcs['invalid']}
+    
+    kept = [i for i, ok in enumerate(fcs['fcs_valid'].tolist()) if ok or not drop_bad_fcs]
+    todo = [(frames_bytes[i], fcs['fcs_valid'][i]) for i in kept]
+    
+    if get_pool is not None and len(todo) >= FRAME_POOL_MIN_FRAMES:
+        workers = os.cpu_count() or 1
+        batch = -(-len(todo) // (workers * 4))
+        batches = [todo[i:i + batch] for i in range(0, len(todo), batch)]
+        decoded = [frame for result in get_pool().map(partial(decode_frame_bytes, dissect=dissect), batches)
+                   for frame in result]
+    else:
+        decoded = decode_frame_bytes(todo, dissect)
+    
+    frames = []
+    for index, frame in zip(kept, decoded):
+        start, end, start_time, end_time = spans[index]
+        frame = frame or {'fcs_valid': bool(fcs['fcs_valid'][index])}
+        frame.update({
+            'index': index,
+            'start_time': start_time,
+            'end_time': end_time,
+            'num_bits': end - start
+        })
+        frames.append(frame)
+    return frames, fcs_summary
@@ -0,0 +1,435 @@
+"""
+Module contenant le décodage Manchester
+
+Cœur du décodage partagé par l'application console (décodage par lots) et
+l'application web Flask : conversion du signal en bits (calcul vectorisé
+sur les fronts) et découpage d'une capture en trames.
+"""
+import numpy as np
+
+from chronometrage import stage
+
+# Segmentation des captures contenant plusieurs trames
+FRAME_GAP_BITS = 8  # Silence minimal entre deux trames (en durées de bit)
+MIN_FRAME_BITS = 112  # Durée minimale d'une trame (en durées de bit, 14 octets)
+MIN_RUN_EDGES = 16  # Plages de fronts plus courtes considérées comme du bruit
+
+# Seuillage à hystérésis (trigger de Schmitt) à seuil glissant
+SLICER_BLOCK_BITS = 4  # Taille des paquets d'échantillons (en durées de bit)
+SLICER_WINDOW_BLOCKS = 16  # Fenêtre glissante de l'enveloppe (en paquets complets précédents)
+SLICER_HYSTERESIS = 0.2  # Largeur de la bande d'hystérésis (fraction de l'amplitude crête à crête)
+SLICER_SWING_PERCENTILE = 90  # Amplitude de référence des paquets (plancher de la bande)
+SLICER_SWING_BLOCKS = 16  # Paquets complets par groupe sur lequel est pris ce centile
+SLICER_CHUNK = 1 << 20  # Échantillons traités par passe (mémoire temporaire bornée)
+
+
+class HysteresisSlicer:
+    """
+    Conversion du signal analogique en niveaux logiques par un trigger de
+    Schmitt dont le seuil suit le signal
+    
+    Le signal est découpé en paquets de block échantillons dont on garde le
+    minimum et le maximum. L'enveloppe d'un paquet (plus grand maximum et
+    plus petit minimum des window paquets complets qui le précèdent) donne
+    le seuil (son milieu) et la bande d'hystérésis (fraction hysteresis de
+    son amplitude). Un échantillon passe à 1 au-dessus de la bande, à 0
+    en dessous, et garde le niveau précédent à l'intérieur : le bruit autour
+    du seuil ne crée plus de fronts et la dérive de la ligne de base est
+    suivie.
+    
+    Dans les silences, l'enveloppe se réduit au bruit : quand son amplitude
+    tombe sous la moitié de l'amplitude de référence, le seuil du dernier
+    paquet actif est conservé, et la bande ne descend jamais sous
+    hysteresis × l'amplitude de référence. Les paquets complets sont
+    regroupés par swing_blocks depuis le début de la capture ; l'amplitude
+    de référence est la plus grande valeur, sur les groupes terminés, du
+    centile SLICER_SWING_PERCENTILE des amplitudes de leurs paquets (nulle
+    avant la fin du premier groupe).
+    
+    Un paquet n'est seuillé qu'avec des paquets complets déjà vus (le
+    premier paquet de la capture, sans prédécesseur, avec l'enveloppe de ses
+    échantillons déjà vus) : le résultat ne dépend pas du découpage du
+    signal en blocs (feed) ni en passes.
+    
+    Le calcul est vectorisé, en O(n) et sans tri du signal, par passes de
+    SLICER_CHUNK échantillons. Le signal peut être fourni en plusieurs blocs
+    (feed) : l'état (dernier niveau, paquet incomplet, derniers paquets
+    complets) est conservé d'un bloc à l'autre.
+    """
+    
+    def __init__(self, block, window=SLICER_WINDOW_BLOCKS, hysteresis=SLICER_HYSTERESIS,
+                 swing_blocks=SLICER_SWING_BLOCKS):
+        self.block = max(int(block), 1)
+        self.window = max(int(window), 1)
+        self.hysteresis = hysteresis
+        self.swing_blocks = max(int(swing_blocks), 1)
+        self.swing = 0.0  # Amplitude de référence
+        self.level = None  # Dernier niveau logique
+        self._held_threshold = None  # Seuil du dernier paquet actif
+        
+        # Extremums des window derniers paquets complets (infinis au début)
+        self._lows = np.full(self.window, np.inf)
+        self._highs = np.full(self.window, -np.inf)
+        # Amplitudes des paquets complets du groupe en cours (moins de swing_blocks)
+        self._swings = np.empty(0)
+        # Paquet incomplet à la fin du bloc précédent : (minimum, maximum, échantillons)
+        self._partial = None
+        
+        # Somme des seuils des paquets (seuil moyen, pour l'affichage)
+        self._threshold_sum = 0.0
+        self._threshold_count = 0
+    
+    @property
+    def threshold(self):
+        """Seuil moyen sur les paquets traités (None avant le premier bloc)"""
+        if self._threshold_count == 0:
+            return None
+        return self._threshold_sum / self._threshold_count
+    
+    def feed(self, signal):
+        """Niveaux logiques (uint8) des échantillons du bloc signal"""
+        signal = np.asarray(signal)
+        digital = np.empty(len(signal), dtype=np.uint8)
+        step = max(SLICER_CHUNK // self.block, 1) * self.block
+        for start in range(0, len(signal), step):
+            self._slice(signal[start:start + step], digital[start:start + step])
+        return digital
+    
+    def _slice(self, signal, out):
+        n = len(signal)
+        
+        # Paquets du morceau : le premier complète le paquet incomplet du
+        # bloc précédent, le dernier peut rester incomplet
+        filled = self._partial[2] if self._partial else 0
+        starts = np.concatenate(([0], np.arange(self.block - filled, n, self.block)))
+        lows = np.minimum.reduceat(signal, starts).astype(np.float64)
+        highs = np.maximum.reduceat(signal, starts).astype(np.float64)
+        if self._partial:
+            lows[0] = min(lows[0], self._partial[0])
+            highs[0] = max(highs[0], self._partial[1])
+        lengths = np.diff(np.append(starts, n))
+        count = len(starts)
+        complete = count - (lengths[-1] + (filled if count == 1 else 0) < self.block)
+        
+        # Enveloppe de chaque paquet : extremums des window paquets complets
+        # qui le précèdent (all_lows[j:j + window] pour le paquet j)
+        all_lows = np.concatenate((self._lows, lows[:complete]))
+        all_highs = np.concatenate((self._highs, highs[:complete]))
+        env_low = all_lows[:count].copy()
+        env_high = all_highs[:count].copy()
+        for shift in range(1, self.window):
+            np.minimum(env_low, all_lows[shift:shift + count], out=env_low)
+            np.maximum(env_high, all_highs[shift:shift + count], out=env_high)
+        
+        # Amplitude de référence avant chaque paquet : plus grande valeur du
+        # centile des amplitudes des groupes de swing_blocks paquets complets
+        # (comptés depuis le début de la capture) déjà terminés
+        waiting = len(self._swings)
+        all_swings = np.concatenate((self._swings, highs[:complete] - lows[:complete]))
+        groups = len(all_swings) // self.swing_blocks
+        percentiles = np.percentile(all_swings[:groups * self.swing_blocks].reshape(groups, -1),
+                                    SLICER_SWING_PERCENTILE, axis=1) if groups else np.empty(0)
+        swings = np.maximum.accumulate(np.concatenate(([self.swing], percentiles)))
+        swing = swings[(waiting + np.arange(count)) // self.swing_blocks]
+        
+        # Dans les silences (enveloppe réduite au bruit), le seuil du
+        # dernier paquet actif est conservé ; le premier paquet de la
+        # capture (enveloppe vide) n'est jamais actif
+        first = np.isinf(env_low[0])
+        if first:
+            env_low[0] = env_high[0] = 0.0
+        thresholds = (env_high + env_low) / 2
+        env_swing = env_high - env_low
+        active = env_swing >= swing / 2
+        active[0] &= not first
+        last_active = np.where(active, np.arange(count), -1)
+        np.maximum.accumulate(last_active, out=last_active)
+        held = self._held_threshold if self._held_threshold is not None else thresholds
+        thresholds = np.where(last_active >= 0, thresholds[last_active], held)
+        if last_active[-1] >= 0:
+            self._held_threshold = thresholds[-1]
+        half_band = self.hysteresis / 2 * np.maximum(env_swing, swing)
+        self._threshold_sum += float(thresholds[first:].sum())
+        self._threshold_count += count - first
+        
+        # Trigger de Schmitt : le niveau passe à 1 au début d'une plage
+        # d'échantillons au-dessus de la bande, à 0 au début d'une plage en
+        # dessous, et ne change pas entre les deux. Seuls les débuts de plage
+        # (peu nombreux) sont manipulés, pas d'index par échantillon.
+        # (bornes dans le type du signal : pas de conversion du signal entier)
+        dtype = signal.dtype if signal.dtype.kind == 'f' else np.float64
+        upper = np.repeat((thresholds + half_band).astype(dtype), lengths)
+        lower = np.repeat((thresholds - half_band).astype(dtype), lengths)
+        if first:
+            # Premier paquet : enveloppe des échantillons déjà vus
+            head = signal[:lengths[0]]
+            seen_low = np.minimum.accumulate(head).astype(np.float64)
+            seen_high = np.maximum.accumulate(head).astype(np.float64)
+            if self._partial:
+                np.minimum(seen_low, self._partial[0], out=seen_low)
+                np.maximum(seen_high, self._partial[1], out=seen_high)
+            band = self.hysteresis / 2 * (seen_high - seen_low)
+            middle = (seen_high + seen_low) / 2
+            upper[:lengths[0]] = middle + band
+            lower[:lengths[0]] = middle - band
+            self._threshold_sum += float(middle[-1])
+            self._threshold_count += 1
+        high = signal > upper
+        low = signal < lower
+        del upper, lower
+        high_starts = np.flatnonzero(high[1:] > high[:-1]) + 1
+        low_starts = np.flatnonzero(low[1:] > low[:-1]) + 1
+        if high[0]:
+            high_starts = np.concatenate(([0], high_starts))
+        if low[0]:
+            low_starts = np.concatenate(([0], low_starts))
+        starts_all = np.concatenate((high_starts, low_starts))
+        order = np.argsort(starts_all, kind='stable')
+        positions = starts_all[order]
+        levels = (order < len(high_starts)).view(np.uint8)
+        
+        # Niveau avant le morceau : celui du morceau précédent, ou bas au
+        # tout début de la capture
+        level = self.level if self.level is not None else np.uint8(0)
+        changes = np.flatnonzero(levels != np.concatenate(([level], levels[:-1])))
+        run_levels = np.concatenate(([level], levels[changes])).astype(np.uint8)
+        out[:] = np.repeat(run_levels, np.diff(np.concatenate(([0], positions[changes], [n]))))
+        self.level = out[-1]
+        
+        # Conserver les derniers paquets complets et le paquet incomplet
+        self._lows = all_lows[-self.window:]
+        self._highs = all_highs[-self.window:]
+        self.swing = float(swings[-1])
+        self._swings = all_swings[groups * self.swing_blocks:]
+        self._partial = ((lows[-1], highs[-1], lengths[-1] + (filled if count == 1 else 0))
+                         if complete < count else None)
+
+
+def mid_bit_edges(edges, samples_per_bit):
+    """
+    Fronts du milieu des bits (ceux qui portent les données) parmi les
+    fronts d'une capture Manchester (positions triées, en échantillons)
+    
+    Deux fronts du milieu de bits consécutifs sont espacés d'un bit (bits
+    différents), ou de deux demi-bits séparés par un front entre les bits
+    (bits égaux). Le front qui suit un intervalle d'un bit est donc au
+    milieu d'un bit ; dans une suite d'intervalles d'un demi-bit, fronts du
+    milieu et fronts entre les bits alternent à partir de l'intervalle d'un
+    bit qui la précède ou, en début de trame (après un silence ou du
+    bruit), de celui qui la suit. Un front sans intervalle d'un bit avant
+    ou après sa suite de demi-bits n'est pas retenu.
+    
+    Returns:
+        (mid, decided) : masque booléen des fronts du milieu des bits, et
+        nombre de fronts en tête dont le classement ne dépend pas des
+        fronts suivants (jusqu'au début du dernier intervalle qui n'est pas
+        d'un demi-bit) : les autres sont à reclasser quand la capture est
+        lue par blocs
+    """
+    count = len(edges)
+    if count < 2:
+        return np.zeros(count, dtype=bool), 0
+    intervals = np.diff(edges)
+    half = (intervals > 0.25 * samples_per_bit) & (intervals < 0.75 * samples_per_bit)
+    full = (intervals >= 0.75 * samples_per_bit) & (intervals < 1.25 * samples_per_bit)
+    indices = np.arange(count - 1)
+    
+    # Pour chaque front : dernier intervalle qui n'est pas d'un demi-bit
+    # avant lui, et premier à partir de lui (-1 / count - 1 si aucun)
+    anchors = np.where(half, -1, indices)
+    before = np.concatenate(([-1], np.maximum.accumulate(anchors)))
+    anchors = np.where(half, count - 1, indices)
+    after = np.concatenate((np.minimum.accumulate(anchors[::-1])[::-1], [count - 1]))
+    
+    full_ext = np.append(full, False)  # full_ext[-1] (aucun intervalle) : False
+    positions = np.arange(count)
+    mid = np.where(full_ext[before],
+                   (positions - 1 - before) % 2 == 0,
+                   full_ext[after] & ((after - positions) % 2 == 0))
+    not_half = np.flatnonzero(~half)
+    decided = int(not_half[-1]) + 1 if len(not_half) else 0
+    return mid, decided
+
+
+def slice_signal(signal, sample_rate=1e9, bit_rate=10e6, threshold=None):
+    """
+    Niveaux logiques (uint8, un octet par échantillon) d'un signal
+    Manchester : comparaison au seuil fixe threshold, ou seuillage à
+    hystérésis à seuil glissant (HysteresisSlicer) si None
+    
+    Returns:
+        (niveaux, seuil fixe ou seuil moyen du seuillage glissant)
+    """
+    with stage('threshold', len(signal)):
+        if threshold is None:
+            samples_per_bit = int(1.0 / bit_rate * sample_rate)
+            slicer = HysteresisSlicer(samples_per_bit * SLICER_BLOCK_BITS)
+            return slicer.feed(signal), slicer.threshold
+        return (signal > threshold).view(np.uint8), threshold
+
+
+def decode_manchester(signal, time, sample_rate=1e9, bit_rate=10e6, threshold=None, digital=None):
+    """
+    Décode un signal Manchester encodé (10BASE-T Ethernet)
+    
+    Args:
+        signal: Signal analogique
+        time: Vecteur temps
+        sample_rate: Taux d'échantillonnage (Hz)
+        bit_rate: Débit en bits/seconde (10 Mbps pour 10BASE-T)
+        threshold: Seuil de décision fixe ; si None, seuillage à hystérésis
+            à seuil glissant (HysteresisSlicer)
+        digital: Niveaux logiques déjà calculés (slice_signal) ; threshold
+            est alors le seuil renvoyé avec eux
+    
+    Returns:
+        dict avec les données décodées : 'bits', 'bit_times', 'bit_positions'
+        et 'edges' sont des tableaux NumPy, 'digital' est le signal numérique
+        (uint8, un octet par échantillon), 'threshold' le seuil fixe ou le
+        seuil moyen du seuillage glissant. Seules les portions envoyées au
+        client sont converties en listes Python.
+    """
+    # Paramètres
+    bit_period = 1.0 / bit_rate  # 100 ns pour 10 Mbps
+    samples_per_bit = int(bit_period * sample_rate)
+    
+    # Convertir en signal numérique (uint8, un octet par échantillon)
+    if digital is None:
+        digital, threshold = slice_signal(signal, sample_rate, bit_rate, threshold)
+    
+    with stage('edges', len(signal)):
+        # Détecter les transitions (fronts) : indices où le niveau change
+        all_edges = np.flatnonzero(digital[1:] != digital[:-1])
+    
+    # Décodage Manchester
+    # Dans Manchester, une transition au milieu du bit encode la donnée:
+    # Transition descendante (1→0) au milieu = bit 1
+    # Transition montante (0→1) au milieu = bit 0
+    
+    with stage('manchester', len(signal)):
+        # Fronts du milieu des bits (les fronts entre deux bits égaux sont écartés)
+        mid, _ = mid_bit_edges(all_edges, samples_per_bit)
+        bit_positions = all_edges[mid]
+        
+        # Le niveau juste avant le front donne le type de transition :
+        # 0 avant le front = front montant = bit 0, 1 avant = front descendant = bit 1
+        bits = digital[bit_positions]
+        bit_times = time[bit_positions]
+    
+    return {
+        'bits': bits,
+        'bit_times': bit_times,
+        'bit_positions': bit_positions,
+        'num_bits': len(bits),
+        'edges': all_edges,
+        'threshold': threshold,
+        'digital': digital
+    }
+
+
+class FrameSegmenter:
+    """
+    Découpe une capture en trames par analyse des plages (run-length) du
+    flux des fronts. Dans une trame Manchester, deux fronts consécutifs
+    sont espacés d'un demi-bit ou d'un bit ; un intervalle plus long
+    (silence) ou plus court (bruit) interrompt la plage en cours.
+    
+    Les plages trop courtes (bruit) sont ignorées, celles séparées de moins
+    de gap_bits durées de bit (parasite dans une trame) sont fusionnées.
+    L'analyse est vectorisée et peut être faite bloc par bloc (méthode
+    feed) : chaque appel reprend le dernier front de l'appel précédent.
+    
+    Chaque trame est décrite par (premier échantillon, dernier échantillon).
+    """
+    
+    def __init__(self, samples_per_bit, gap_bits=FRAME_GAP_BITS, min_frame_bits=MIN_FRAME_BITS,
+                 min_run_edges=MIN_RUN_EDGES):
+        self.min_interval = 0.2 * samples_per_bit
+        self.max_interval = 1.3 * samples_per_bit
+        self.max_gap = gap_bits * samples_per_bit
+        self.min_frame_samples = min_frame_bits * samples_per_bit
+        self.min_run_edges = min_run_edges
+        self.spans = []
+        self._last_edge = None
+        self._run = None  # [premier front, dernier front, nombre d'intervalles] de la plage en cours
+        self._span = None  # [début, fin] de la trame en cours de fusion
+    
+    def feed(self, edge_positions):
+        """Ajoute les positions (échantillons) d'un bloc de fronts, triées"""
+        if self._last_edge is not None and len(edge_positions) and edge_positions[0] != self._last_edge:
+            edge_positions = np.concatenate(([self._last_edge], edge_positions))
+        if len(edge_positions) < 2:
+            if len(edge_positions):
+                self._last_edge = edge_positions[-1]
+            return
+        
+        intervals = np.diff(edge_positions)
+        valid = (intervals > self.min_interval) & (intervals < self.max_interval)
+        
+        # Début et fin (exclue) de chaque plage d'intervalles valides
+        padded = np.concatenate(([False], valid, [False])).astype(np.int8)
+        changes = np.diff(padded)
+        run_starts = np.flatnonzero(changes == 1)
+        run_ends = np.flatnonzero(changes == -1)
+        
+        for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+            if start == 0 and self._run is not None and self._run[1] == edge_positions[0]:
+                # Prolonge la plage du bloc précédent
+                self._run[1] = edge_positions[end]
+                self._run[2] += end
+            else:
+                self._close_run()
+                self._run = [edge_positions[start], edge_positions[end], end - start]
+            if end < len(valid):
+                self._close_run()
+        
+        self._last_edge = edge_positions[-1]
+    
+    def _close_run(self):
+        """Termine la plage en cours et la fusionne avec la trame en cours si proche"""
+        if self._run is None:
+            return
+        first, last, count = self._run
+        self._run = None
+        if count < self.min_run_edges:
+            return
+        if self._span is not None and first - self._span[1] <= self.max_gap:
+            self._span[1] = last
+        else:
+            self._close_span()
+            self._span = [first, last]
+    
+    def _close_span(self):
+        if self._span is not None and self._span[1] - self._span[0] >= self.min_frame_samples:
+            self.spans.append((int(self._span[0]), int(self._span[1])))
+        self._span = None
+    
+    def finish(self):
+        """Ferme la dernière trame et retourne la liste des trames"""
+        self._close_run()
+        self._close_span()
+        return self.spans
+
+def frame_bit_ranges(bit_positions, spans):
+    """Indices (début, fin exclue) des bits contenus dans chaque trame"""
+    if not spans:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    bounds = np.asarray(spans)
+    return (np.searchsorted(bit_positions, bounds[:, 0], side='left'),
+            np.searchsorted(bit_positions, bounds[:, 1], side='right'))
+
+
+def segment_frames(decoded, time, sample_rate, bit_rate=10e6):
+    """
+    Découpe une capture décodée par decode_manchester en trames.
+
+    Returns:
+        liste de (premier bit, fin des bits exclue, instant de début, instant de fin)
+    """
+    with stage('framing'):
+        segmenter = FrameSegmenter(int(sample_rate / bit_rate))
+        segmenter.feed(decoded['edges'])
+        spans = segmenter.finish()
+        first_bits, end_bits = frame_bit_ranges(decoded['bit_positions'], spans)
+    return [(a, b, float(time[start]), float(time[end]))
+            for a, b, (start, end) in zip(first_bits.tolist(), end_bits.tolist(), spans)]
@@ -0,0 +1,237 @@
+"""
+Module contenant les dissecteurs de protocoles au-dessus d'Ethernet
+
+Chaque dissecteur est enregistré dans une table, indexée par EtherType
+(ETHERTYPES) ou par numéro de protocole IP (IP_PROTOCOLS) : la couche
+suivante est choisie par simple consultation de la table. La dissection
+est paresseuse : une couche n'analyse la suivante que lorsqu'on la lui
+demande (attribut next), si bien qu'un résumé de trame ne coûte que la
+lecture de l'en-tête Ethernet.
+
+Protocoles couverts : 802.1Q (VLAN), ARP, IPv4, IPv6, ICMP, ICMPv6, UDP, TCP.
+"""
+import ipaddress
+import struct
+from collections import namedtuple
+
+Dissector = namedtuple('Dissector', ['name', 'parse'])
+
+ETHERTYPES = {}  # EtherType -> Dissector
+IP_PROTOCOLS = {}  # Numéro de protocole IP (IPv4) / Next Header (IPv6) -> Dissector
+
+ETHERNET_HEADER = struct.Struct('!6s6sH')
+VLAN_TAG = struct.Struct('!HH')
+ARP_HEADER = struct.Struct('!HHBBH')
+IPV4_HEADER = struct.Struct('!BBHHHBBH4s4s')
+IPV6_HEADER = struct.Struct('!IHBB16s16s')
+ICMP_HEADER = struct.Struct('!BBH')
+UDP_HEADER = struct.Struct('!HHHH')
+TCP_HEADER = struct.Struct('!HHIIBBHHH')
+TCP_FLAGS = 'FSRPAUEC'  # FIN, SYN, RST, PSH, ACK, URG, ECE, CWR (bit 0 à 7)
+
+
+def dissector(table, key, name):
+    """
+    Enregistre une fonction de dissection dans une table. La fonction
+    reçoit (data, offset) et retourne (champs, longueur de l'en-tête,
+    table de la couche suivante, clé dans cette table) ; table None si
+    la dissection s'arrête à cette couche.
+    """
+    def register(parse):
+        table[key] = Dissector(name, parse)
+        return parse
+    return register
+
+
+def ethertype_name(ethertype):
+    """Nom du protocole transporté, d'après la table des EtherTypes"""
+    if ethertype <= 1500:
+        return f'IEEE 802.3 (longueur: {ethertype})'
+    entry = ETHERTYPES.get(ethertype)
+    return entry.name if entry else f'Inconnu (0x{ethertype:04X})'
+
+
+class Layer:
+    """
+    Couche d'une trame disséquée : nom, position et longueur de l'en-tête
+    dans la trame, champs décodés. La couche suivante n'est analysée qu'au
+    premier accès à next (None si inconnue ou absente).
+    """
+    __slots__ = ('name', 'offset', 'length', 'fields', '_data', '_table', '_key', '_next', '_parsed')
+
+    def __init__(self, name, data, offset, length, fields, table=None, key=None):
+        self.name = name
+        self.offset = offset
+        self.length = length
+        self.fields = fields
+        self._data = data
+        self._table = table
+        self._key = key
+        self._next = None
+        self._parsed = table is None
+
+    @property
+    def next(self):
+        if not self._parsed:
+            self._parsed = True
+            self._next = dissect_layer(self._data, self.offset + self.length, self._table, self._key)
+        return self._next
+
+    def to_list(self, depth=None):
+        """Cette couche et les suivantes (au plus depth couches) sous forme de dicts"""
+        layers, layer = [], self
+        while layer is not None and (depth is None or len(layers) < depth):
+            layers.append({'name': layer.name, 'offset': layer.offset,
+                           'length': layer.length, 'fields': layer.fields})
+            layer = layer.next
+        return layers
+
+
+def dissect_layer(data, offset, table, key):
+    """Analyse la couche située à offset avec le dissecteur table[key] (None si inconnu)"""
+    entry = table.get(key)
+    if entry is None or offset >= len(data):
+        return None
+    try:
+        fields, length, next_table, next_key = entry.parse(data, offset)
+    except (struct.error, ValueError):
+        return Layer(entry.name, data, offset, len(data) - offset, {'error': 'En-tête tronqué'})
+    return Layer(entry.name, data, offset, length, fields, next_table, next_key)
+
+
+def dissect_frame(bytes_data, start=0):
+    """
+    Racine de la dissection d'une trame : couche Ethernet II (ou 802.3)
+    dont l'en-tête commence à start (après le SFD). Le FCS est exclu.
+    """
+    data = memoryview(bytes_data)[:-4]
+    if len(data) - start < ETHERNET_HEADER.size:
+        return Layer('Ethernet II', data, start, max(len(data) - start, 0), {'error': 'En-tête tronqué'})
+    dest, src, ethertype = ETHERNET_HEADER.unpack_from(data, start)
+    fields = {
+        'dest_mac': dest.hex(':').upper(),
+        'src_mac': src.hex(':').upper(),
+        'ethertype': f'0x{ethertype:04X}'
+    }
+    if ethertype <= 1500:
+        return Layer('IEEE 802.3', data, start, ETHERNET_HEADER.size, fields)
+    return Layer('Ethernet II', data, start, ETHERNET_HEADER.size, fields, ETHERTYPES, ethertype)
+
+
+@dissector(ETHERTYPES, 0x8100, '802.1Q (VLAN)')
+def parse_vlan(data, offset):
+    tci, ethertype = VLAN_TAG.unpack_from(data, offset)
+    fields = {
+        'priority': tci >> 13,
+        'dei': (tci >> 12) & 1,
+        'vlan_id': tci & 0x0FFF,
+        'ethertype': f'0x{ethertype:04X}'
+    }
+    return fields, VLAN_TAG.size, ETHERTYPES, ethertype
+
+
+@dissector(ETHERTYPES, 0x0806, 'ARP')
+def parse_arp(data, offset):
+    htype, ptype, hlen, plen, operation = ARP_HEADER.unpack_from(data, offset)
+    pos = offset + ARP_HEADER.size
+    addresses = []
+    for size in (hlen, plen, hlen, plen):
+        if pos + size > len(data):
+            raise ValueError('adresse ARP tronquée')
+        addresses.append(bytes(data[pos:pos + size]))
+        pos += size
+    sha, spa, tha, tpa = addresses
+    ip = (lambda a: str(ipaddress.IPv4Address(a))) if ptype == 0x0800 and plen == 4 else bytes.hex
+    fields = {
+        'hardware_type': htype,
+        'protocol_type': f'0x{ptype:04X}',
+        'operation': {1: 'request', 2: 'reply'}.get(operation, operation),
+        'sender_mac': sha.hex(':').upper(),
+        'sender_ip': ip(spa),
+        'target_mac': tha.hex(':').upper(),
+        'target_ip': ip(tpa)
+    }
+    return fields, pos - offset, None, None
+
+
+@dissector(ETHERTYPES, 0x0800, 'IPv4')
+def parse_ipv4(data, offset):
+    (version_ihl, tos, total_length, identification, flags_fragment,
+     ttl, protocol, checksum, src, dst) = IPV4_HEADER.unpack_from(data, offset)
+    header_length = (version_ihl & 0x0F) * 4
+    if header_length < IPV4_HEADER.size:
+        raise ValueError('IHL invalide')
+    fragment_offset = flags_fragment & 0x1FFF
+    fields = {
+        'version': version_ihl >> 4,
+        'header_length': header_length,
+        'dscp': tos >> 2,
+        'ecn': tos & 0x03,
+        'total_length': total_length,
+        'identification': identification,
+        'dont_fragment': bool(flags_fragment & 0x4000),
+        'more_fragments': bool(flags_fragment & 0x2000),
+        'fragment_offset': fragment_offset,
+        'ttl': ttl,
+        'protocol': protocol,
+        'checksum': f'0x{checksum:04X}',
+        'src': str(ipaddress.IPv4Address(src)),
+        'dst': str(ipaddress.IPv4Address(dst))
+    }
+    # Seul le premier fragment contient l'en-tête de la couche suivante
+    return fields, header_length, (IP_PROTOCOLS if fragment_offset == 0 else None), protocol
+
+
+@dissector(ETHERTYPES, 0x86DD, 'IPv6')
+def parse_ipv6(data, offset):
+    first_word, payload_length, next_header, hop_limit, src, dst = IPV6_HEADER.unpack_from(data, offset)
+    fields = {
+        'version': first_word >> 28,
+        'traffic_class': (first_word >> 20) & 0xFF,
+        'flow_label': first_word & 0xFFFFF,
+        'payload_length': payload_length,
+        'next_header': next_header,
+        'hop_limit': hop_limit,
+        'src': str(ipaddress.IPv6Address(src)),
+        'dst': str(ipaddress.IPv6Address(dst))
+    }
+    return fields, IPV6_HEADER.size, IP_PROTOCOLS, next_header
+
+
+def parse_icmp(data, offset):
+    icmp_type, code, checksum = ICMP_HEADER.unpack_from(data, offset)
+    fields = {'type': icmp_type, 'code': code, 'checksum': f'0x{checksum:04X}'}
+    return fields, ICMP_HEADER.size, None, None
+
+
+dissector(IP_PROTOCOLS, 1, 'ICMP')(parse_icmp)
+dissector(IP_PROTOCOLS, 58, 'ICMPv6')(parse_icmp)
+
+
+@dissector(IP_PROTOCOLS, 17, 'UDP')
+def parse_udp(data, offset):
+    src_port, dst_port, length, checksum = UDP_HEADER.unpack_from(data, offset)
+    fields = {'src_port': src_port, 'dst_port': dst_port, 'length': length,
+              'checksum': f'0x{checksum:04X}'}
+    return fields, UDP_HEADER.size, None, None
+
+
+@dissector(IP_PROTOCOLS, 6, 'TCP')
+def parse_tcp(data, offset):
+    (src_port, dst_port, seq, ack, data_offset, flags,
+     window, checksum, urgent) = TCP_HEADER.unpack_from(data, offset)
+    header_length = (data_offset >> 4) * 4
+    if header_length < TCP_HEADER.size:
+        raise ValueError('Data Offset invalide')
+    fields = {
+        'src_port': src_port,
+        'dst_port': dst_port,
+        'seq': seq,
+        'ack': ack,
+        'header_length': header_length,
+        'flags': ''.join(flag for bit, flag in enumerate(TCP_FLAGS) if flags & (1 << bit)),
+        'window': window,
+        'checksum': f'0x{checksum:04X}',
+        'urgent_pointer': urgent
+    }
+    return fields, header_length, None, None
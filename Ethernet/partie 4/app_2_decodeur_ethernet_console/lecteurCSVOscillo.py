@@ -0,0 +1,230 @@
+"""
+Module contenant la classe LecteurCSVOscillo
+
+Lecture des fichiers CSV exportés par l'oscilloscope (Tektronix) et cache
+binaire associé : à la première lecture, la capture est convertie en un
+fichier compagnon '<capture>.csv.oscbin' (échantillons float32 bruts +
+en-tête), ouvert ensuite avec np.memmap sans recopier les données.
+
+Format du fichier .oscbin (little-endian) :
+    - 8 octets   : signature b'OSCBIN01'
+    - uint32     : taille de l'en-tête JSON (octets)
+    - uint64     : nombre d'échantillons
+    - uint32     : nombre de voies
+    - float64    : instant du premier échantillon (s)
+    - float64    : intervalle d'échantillonnage (s)
+    - JSON       : métadonnées, noms des colonnes, taille/date du CSV source
+    - bourrage jusqu'à un multiple de 64 octets
+    - données    : float32, une ligne par échantillon, une colonne par voie
+"""
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIGNATURE = b'OSCBIN01'
+ENTETE_FIXE = struct.Struct('<8sIQIdd')
+ALIGNEMENT = 64
+EXTENSION_CACHE = '.oscbin'
+TAILLE_BLOC = 1_000_000  # Nombre de lignes CSV lues à la fois
+
+
+def lire_entete_csv(flux):
+    """
+    Lit l'en-tête d'un fichier CSV d'oscilloscope ligne par ligne, jusqu'à
+    la ligne 'TIME,...' (incluse).
+
+    Returns:
+        (metadata, colonnes) : dict des métadonnées et noms des colonnes de données
+    """
+    metadata = {}
+    for ligne in flux:
+        ligne = ligne.rstrip('\r\n')
+        if ligne.startswith('TIME,'):
+            return metadata, [colonne.strip() for colonne in ligne.split(',')]
+        if ',' in ligne:
+            parties = ligne.split(',', 1)
+            if len(parties) == 2:
+                metadata[parties[0]] = parties[1]
+    raise ValueError("Ligne d'en-tête 'TIME,' introuvable")
+
+
+def lire_blocs_csv(flux, colonnes, taille_bloc=TAILLE_BLOC):
+    """Génère la section de données d'un CSV par blocs (tableaux 2D, une colonne par voie)"""
+    for bloc in pd.read_csv(flux, header=None, names=colonnes, chunksize=taille_bloc):
+        yield bloc.to_numpy()
+
+
+def chemin_cache(chemin_csv):
+    """Chemin du fichier binaire compagnon d'une capture CSV"""
+    chemin_csv = Path(chemin_csv)
+    return chemin_csv.with_name(chemin_csv.name + EXTENSION_CACHE)
+
+
+def _signature_source(chemin_csv):
+    """Taille et date de modification du CSV, pour détecter un changement"""
+    stat = os.stat(chemin_csv)
+    return {'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def convertir_en_binaire(chemin_csv, chemin_bin=None, taille_bloc=TAILLE_BLOC):
+    """
+    Convertit une capture CSV en fichier binaire .oscbin, bloc par bloc
+    (mémoire bornée quelle que soit la taille de la capture).
+
+    Returns:
+        Chemin du fichier binaire créé
+    """
+    chemin_csv = Path(chemin_csv)
+    chemin_bin = Path(chemin_bin) if chemin_bin else chemin_cache(chemin_csv)
+    chemin_tmp = chemin_bin.with_name(chemin_bin.name + '.tmp')
+    source = _signature_source(chemin_csv)
+
+    with open(chemin_csv, 'r', encoding='utf-8') as flux:
+        metadata, colonnes = lire_entete_csv(flux)
+        nb_voies = len(colonnes) - 1
+        entete_json = json.dumps({
+            'metadata': metadata,
+            'colonnes': colonnes,
+            'source': source
+        }).encode('utf-8')
+        debut_donnees = -(-(ENTETE_FIXE.size + len(entete_json)) // ALIGNEMENT) * ALIGNEMENT
+
+        nb_echantillons = 0
+        t_premier = t_dernier = 0.0
+        with open(chemin_tmp, 'wb') as sortie:
+            sortie.write(bytes(debut_donnees))
+            for bloc in lire_blocs_csv(flux, colonnes, taille_bloc):
+                if nb_echantillons == 0:
+                    t_premier = float(bloc[0, 0])
+                t_dernier = float(bloc[-1, 0])
+                nb_echantillons += len(bloc)
+                sortie.write(np.ascontiguousarray(bloc[:, 1:], dtype='<f4').tobytes())
+
+            intervalle = (t_dernier - t_premier) / (nb_echantillons - 1) if nb_echantillons > 1 else 0.0
+            sortie.seek(0)
+            sortie.write(ENTETE_FIXE.pack(SIGNATURE, len(entete_json), nb_echantillons,
+                                          nb_voies, t_premier, intervalle))
+            sortie.write(entete_json)
+
+    os.replace(chemin_tmp, chemin_bin)
+    return chemin_bin
+
+
+def ouvrir_binaire(chemin_bin):
+    """
+    Ouvre un fichier .oscbin en mémoire partagée (np.memmap, lecture seule).
+
+    Returns:
+        (entete, echantillons) : dict de l'en-tête et memmap float32 de forme
+        (nombre d'échantillons, nombre de voies)
+    """
+    with open(chemin_bin, 'rb') as f:
+        signature, taille_json, nb_echantillons, nb_voies, t_premier, intervalle = \
+            ENTETE_FIXE.unpack(f.read(ENTETE_FIXE.size))
+        if signature != SIGNATURE:
+            raise ValueError(f"{chemin_bin} n'est pas un fichier {EXTENSION_CACHE}")
+        entete = json.loads(f.read(taille_json).decode('utf-8'))
+
+    entete.update({
+        'nb_echantillons': nb_echantillons,
+        'nb_voies': nb_voies,
+        't_premier': t_premier,
+        'intervalle_echantillon': intervalle
+    })
+    debut_donnees = -(-(ENTETE_FIXE.size + taille_json) // ALIGNEMENT) * ALIGNEMENT
+    if nb_echantillons == 0:
+        return entete, np.empty((0, nb_voies), dtype='<f4')
+    echantillons = np.memmap(chemin_bin, dtype='<f4', mode='r', offset=debut_donnees,
+                             shape=(nb_echantillons, nb_voies))
+    return entete, echantillons
+
+
+def cache_a_jour(chemin_csv, chemin_bin=None):
+    """Vrai si le fichier binaire existe et correspond au CSV actuel"""
+    chemin_bin = Path(chemin_bin) if chemin_bin else chemin_cache(chemin_csv)
+    if not chemin_bin.exists():
+        return False
+    try:
+        with open(chemin_bin, 'rb') as f:
+            signature, taille_json = ENTETE_FIXE.unpack(f.read(ENTETE_FIXE.size))[:2]
+            if signature != SIGNATURE:
+                return False
+            source = json.loads(f.read(taille_json).decode('utf-8'))['source']
+    except (OSError, ValueError, KeyError, struct.error):
+        return False
+    return source == _signature_source(chemin_csv)
+
+
+class BaseDeTemps:
+    """
+    Vecteur temps d'un échantillonnage régulier, calculé à la demande
+    (t = t_premier + i * intervalle) au lieu d'être stocké en mémoire.
+    S'indexe comme un tableau NumPy : base[i], base[indices], base[-1].
+    """
+
+    def __init__(self, t_premier, intervalle, nb_echantillons):
+        self.t_premier = t_premier
+        self.intervalle = intervalle
+        self.nb_echantillons = nb_echantillons
+
+    def __len__(self):
+        return self.nb_echantillons
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.t_premier + np.arange(*index.indices(self.nb_echantillons)) * self.intervalle
+        index = np.asarray(index)
+        temps = self.t_premier + np.where(index < 0, index + self.nb_echantillons, index) * self.intervalle
+        return float(temps) if temps.ndim == 0 else temps
+
+
+class LecteurCSVOscillo:
+    """
+    Lecteur d'une capture CSV d'oscilloscope, via son cache binaire .oscbin
+    (créé ou reconstruit automatiquement si le CSV a changé).
+    """
+
+    def __init__(self, chemin_fichier: str):
+        self.chemin_fichier = chemin_fichier
+        self.donnees = None
+        self.echantillons = None  # Toutes les voies (une colonne par voie)
+        self.intervalle_echantillon = None
+        self.metadata = {}
+        self.colonnes = []
+        self.temps = None
+
+    def charger_donnees(self, voie: int = 0):
+        """
+        Charge les échantillons d'une voie (0 = première voie après TIME).
+
+        Returns:
+            (donnees, intervalle_echantillon) : vue np.memmap float32 sur les
+            échantillons et intervalle d'échantillonnage en secondes
+        """
+        chemin_bin = chemin_cache(self.chemin_fichier)
+        if not cache_a_jour(self.chemin_fichier, chemin_bin):
+            convertir_en_binaire(self.chemin_fichier, chemin_bin)
+
+        entete, echantillons = ouvrir_binaire(chemin_bin)
+        self.metadata = entete['metadata']
+        self.colonnes = entete['colonnes']
+        self.intervalle_echantillon = entete['intervalle_echantillon']
+        self.temps = BaseDeTemps(entete['t_premier'], self.intervalle_echantillon,
+                                 entete['nb_echantillons'])
+        self.echantillons = echantillons
+        self.donnees = echantillons[:, voie]
+        return self.donnees, self.intervalle_echantillon
+
+
+if __name__ == '__main__':
+    # Usage : python lecteurCSVOscillo.py capture.csv [...]
+    for chemin in sys.argv[1:]:
+        lecteur = LecteurCSVOscillo(chemin)
+        donnees, intervalle = lecteur.charger_donnees()
+        print(f"{chemin} -> {chemin_cache(chemin)} : {len(donnees)} échantillons, "
+              f"{1 / intervalle / 1e9:.2f} GSa/s, voies {lecteur.colonnes[1:]}")
@@ -0,0 +1,78 @@
+"""
+Benchmark mémoire du modèle objet des voitures
+
+Compare les octets alloués par voiture (tracemalloc) pour une flotte de N
+voitures :
+    - avant : chaque voiture crée son Moteur et ses 4 Roues, attributs
+      dans un __dict__ (ancien modèle, reproduit ci-dessous)
+    - après : voitures.py (__slots__, Moteur et Roue partagés)
+
+Usage:
+    python benchmark_memoire.py
+    python benchmark_memoire.py --voitures 1000000
+"""
+import argparse
+import gc
+import time as chrono
+import tracemalloc
+
+from voitures import Voiture
+
+
+# Ancien modèle, pour comparaison : 6 objets avec __dict__ par voiture
+class AncienMoteur:
+    def __init__(self, puissance, type_carburant):
+        self.__puissance = puissance
+        self.__type_carburant = type_carburant
+
+
+class AncienneRoue:
+    def __init__(self, taille, type_roue):
+        self.__taille = taille
+        self.__type = type_roue
+
+
+class AncienneVoiture:
+    def __init__(self, marque, modele, annee, couleur):
+        self.__marque = marque
+        self.__modele = modele
+        self.__annee = annee
+        self.__couleur = couleur
+        self.__moteur = AncienMoteur(puissance=150, type_carburant="Essence")
+        self.__roues = [AncienneRoue(taille=17, type_roue="Été") for _ in range(4)]
+        self.__conducteur = None
+
+
+MODELES = {'avant': AncienneVoiture, 'après': Voiture}
+
+
+def mesurer(classe, nb_voitures):
+    """Octets alloués par voiture et durée de création de nb_voitures voitures"""
+    gc.collect()
+    tracemalloc.start()
+    debut = chrono.perf_counter()
+    flotte = [classe("Renault", "Clio", 2023, "Bleu") for _ in range(nb_voitures)]
+    duree = chrono.perf_counter() - debut
+    octets, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del flotte
+    return octets / nb_voitures, duree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mémoire du modèle des voitures")
+    parser.add_argument('--voitures', type=int, default=100_000, help="Nombre de voitures")
+    args = parser.parse_args()
+
+    print(f"{args.voitures:,} voitures")
+    print(f"{'modèle':>8} {'octets/voiture':>15} {'total (Mo)':>11} {'création (s)':>13}")
+    resultats = {}
+    for nom, classe in MODELES.items():
+        octets, duree = mesurer(classe, args.voitures)
+        resultats[nom] = octets
+        print(f"{nom:>8} {octets:>15,.0f} {octets * args.voitures / 1e6:>11,.1f} {duree:>13.2f}")
+    print(f"Gain : x{resultats['avant'] / resultats['après']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
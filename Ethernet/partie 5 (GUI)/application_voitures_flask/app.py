@@ -27,15 +27,27 @@ Exemple :
     Quand on visite http://localhost:5000/hello, la fonction hello() s'exécute.
 """
 
-from flask import Flask, jsonify
-from voitures import Voiture, Conducteur
+from functools import partial
+
+from flask import Flask, jsonify, request
+from flotte import Flotte, ACTIONS
 
 # Création de l'application Flask
 app = Flask(__name__)
 
-# Variables globales pour stocker nos objets (en production, utiliser une base de données)
-voiture = None
-conducteur = None
+# Flotte partagée : toutes les voitures et tous les conducteurs, identifiés
+# par leur id (en production, utiliser une base de données). Les routes du
+# tutoriel agissent sur la voiture ?voiture=<id> et le conducteur
+# ?conducteur=<id>, par défaut les derniers créés.
+flotte = Flotte()
+derniers = {'voiture': None, 'conducteur': None}
+
+MAX_LOT = 10_000  # Voitures au plus par requête de lot
+
+
+def id_demande(nom):
+    """Identifiant donné dans l'URL (?voiture=, ?conducteur=), sinon le dernier créé"""
+    return request.args.get(nom, derniers[nom], type=int)
 
 
 # ROUTE 1 : Page d'accueil
@@ -57,6 +69,15 @@ def home():
         <li><a href="/retirer-conducteur">/retirer-conducteur</a> - Retirer le conducteur</li>
         <li><a href="/status">/status</a> - Voir l'état actuel</li>
     </ul>
+    <h2>Flotte (plusieurs voitures, identifiées par leur id) :</h2>
+    <ul>
+        <li>POST /flotte/voitures, POST /flotte/conducteurs - Créer des voitures / conducteurs (par lots)</li>
+        <li>POST /flotte/associer - Associer des conducteurs à des voitures</li>
+        <li>POST /flotte/demarrer, /flotte/accelerer, /flotte/freiner, /flotte/arreter - Action sur un lot de voitures</li>
+        <li><a href="/flotte/voitures/1">/flotte/voitures/&lt;id&gt;</a> - État d'une voiture</li>
+        <li><a href="/flotte/evenements">/flotte/evenements</a> - Journal des événements</li>
+        <li><a href="/flotte/stats">/flotte/stats</a> - Statistiques de la flotte</li>
+    </ul>
     """
 
 
@@ -68,12 +89,13 @@ def creer_voiture():
     Cette route crée une nouvelle voiture.
     Le moteur et les roues sont créés automatiquement (composition).
     """
-    global voiture
-    voiture = Voiture(marque="Renault", modele="Clio", annee=2023, couleur="Bleu")
+    derniers['voiture'] = id_voiture = flotte.creer_voiture(marque="Renault", modele="Clio",
+                                                            annee=2023, couleur="Bleu")
     
     return jsonify({
         "message": "Voiture créée avec succès",
-        "details": "Une Renault Clio 2023 bleue (avec moteur et 4 roues)"
+        "details": "Une Renault Clio 2023 bleue (avec moteur et 4 roues)",
+        "id": id_voiture
     })
 
 
@@ -85,12 +107,12 @@ def creer_conducteur():
     Cette route crée un conducteur indépendant.
     Il existe séparément de la voiture (agrégation).
     """
-    global conducteur
-    conducteur = Conducteur(nom="Marie", permis="B")
+    derniers['conducteur'] = id_conducteur = flotte.creer_conducteur(nom="Marie", permis="B")
     
     return jsonify({
         "message": "Conducteur créé avec succès",
-        "details": "Marie avec permis B"
+        "details": "Marie avec permis B",
+        "id": id_conducteur
     })
 
 
@@ -102,72 +124,43 @@ def associer_conducteur():
     Cette route associe le conducteur à la voiture.
     Démontre l'agrégation : on lie deux objets indépendants.
     """
-    if not voiture:
+    id_voiture, id_conducteur = id_demande('voiture'), id_demande('conducteur')
+    if id_voiture not in flotte.voitures:
         return jsonify({"erreur": "Créez d'abord une voiture avec /creer-voiture"}), 400
     
-    if not conducteur:
+    if id_conducteur not in flotte.conducteurs:
         return jsonify({"erreur": "Créez d'abord un conducteur avec /creer-conducteur"}), 400
     
-    voiture.set_conducteur(conducteur)
+    flotte.associer(id_voiture, id_conducteur)
     
     return jsonify({
         "message": "Conducteur associé à la voiture",
-        "details": "Marie est maintenant dans la Renault Clio"
+        "details": f"Le conducteur {id_conducteur} est maintenant dans la voiture {id_voiture}"
     })
 
 
-# ROUTE 5 : Démarrer la voiture
-# ==============================
-@app.route('/demarrer')
-def demarrer():
-    """
-    Cette route démarre la voiture.
-    Nécessite un conducteur (validation métier).
-    """
-    if not voiture:
-        return jsonify({"erreur": "Pas de voiture"}), 400
-    
-    try:
-        voiture.demarrer()
-        return jsonify({"message": "Voiture démarrée"})
-    except:
-        return jsonify({"erreur": "Impossible de démarrer (pas de conducteur?)"}), 400
-
-
-# ROUTE 6 : Accélérer
-# ====================
-@app.route('/accelerer')
-def accelerer():
-    """Route pour accélérer la voiture"""
-    if not voiture:
-        return jsonify({"erreur": "Pas de voiture"}), 400
-    
-    voiture.accelerer()
-    return jsonify({"message": "Voiture accélère"})
+# ROUTES 5 à 8 : Démarrer, accélérer, freiner, arrêter la voiture
+# ================================================================
+MESSAGES = {
+    'demarrer': ("Voiture démarrée", "Impossible de démarrer (pas de conducteur?)"),
+    'accelerer': ("Voiture accélère", "Impossible d'accélérer (pas de conducteur?)"),
+    'freiner': ("Voiture freine", None),
+    'arreter': ("Voiture arrêtée", None),
+}
 
-
-# ROUTE 7 : Freiner
-# ==================
-@app.route('/freiner')
-def freiner():
-    """Route pour freiner la voiture"""
-    if not voiture:
+def action_voiture(action):
+    """Applique une action à la voiture demandée (validation métier : démarrer nécessite un conducteur)"""
+    id_voiture = id_demande('voiture')
+    resultat = flotte.executer(action, [id_voiture]).get(id_voiture) if id_voiture else None
+    if resultat is None:
         return jsonify({"erreur": "Pas de voiture"}), 400
-    
-    voiture.freiner()
-    return jsonify({"message": "Voiture freine"})
+    succes, echec = MESSAGES[action]
+    if not resultat:
+        return jsonify({"erreur": echec}), 400
+    return jsonify({"message": succes})
 
-
-# ROUTE 8 : Arrêter la voiture
-# =============================
-@app.route('/arreter')
-def arreter():
-    """Route pour arrêter la voiture"""
-    if not voiture:
-        return jsonify({"erreur": "Pas de voiture"}), 400
-    
-    voiture.arreter()
-    return jsonify({"message": "Voiture arrêtée"})
+for _action in ACTIONS:
+    app.add_url_rule(f'/{_action}', _action, partial(action_voiture, _action))
 
 
 # ROUTE 9 : Retirer le conducteur
@@ -178,11 +171,9 @@ def retirer_conducteur():
     Cette route retire le conducteur de la voiture.
     Démontre l'agrégation : le conducteur continue d'exister.
     """
-    if not voiture:
+    if not flotte.retirer_conducteur(id_demande('voiture')):
         return jsonify({"erreur": "Pas de voiture"}), 400
     
-    voiture.remove_conducteur()
-    
     return jsonify({
         "message": "Conducteur retiré de la voiture",
         "details": "Le conducteur existe toujours mais n'est plus dans la voiture"
@@ -194,13 +185,96 @@ def retirer_conducteur():
 @app.route('/status')
 def status():
     """Route pour voir l'état actuel du système"""
+    etat = flotte.etat(id_demande('voiture') or 0)
     return jsonify({
-        "voiture_existe": voiture is not None,
-        "conducteur_existe": conducteur is not None,
-        "conducteur_dans_voiture": voiture._Voiture__conducteur is not None if voiture else False
+        "voiture_existe": etat is not None,
+        "conducteur_existe": id_demande('conducteur') in flotte.conducteurs,
+        "conducteur_dans_voiture": bool(etat and etat['conducteur']),
+        "voiture": etat
     })
 
 
+# ROUTES 11 à 16 : La flotte (JSON, par lots)
+# ============================================
+def corps_lot(cle):
+    """Liste cle du corps JSON de la requête (400 si absente ou trop longue)"""
+    valeurs = (request.get_json(silent=True) or {}).get(cle)
+    if not isinstance(valeurs, list) or len(valeurs) > MAX_LOT:
+        return None
+    return valeurs
+
+@app.route('/flotte/voitures', methods=['POST'])
+def flotte_creer_voitures():
+    """Crée des voitures : {"voitures": [{"marque": ..., "modele": ..., "annee": ..., "couleur": ...}, ...]}"""
+    voitures = corps_lot('voitures')
+    if voitures is None:
+        return jsonify({"erreur": f"Liste 'voitures' attendue (au plus {MAX_LOT})"}), 400
+    try:
+        ids = [flotte.creer_voiture(v['marque'], v['modele'], int(v['annee']), v['couleur'])
+               for v in voitures]
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"erreur": f"Voiture invalide : {e}"}), 400
+    return jsonify({"ids": ids}), 201
+
+@app.route('/flotte/conducteurs', methods=['POST'])
+def flotte_creer_conducteurs():
+    """Crée des conducteurs : {"conducteurs": [{"nom": ..., "permis": ...}, ...]}"""
+    conducteurs = corps_lot('conducteurs')
+    if conducteurs is None:
+        return jsonify({"erreur": f"Liste 'conducteurs' attendue (au plus {MAX_LOT})"}), 400
+    try:
+        ids = [flotte.creer_conducteur(c['nom'], c['permis']) for c in conducteurs]
+    except (KeyError, TypeError) as e:
+        return jsonify({"erreur": f"Conducteur invalide : {e}"}), 400
+    return jsonify({"ids": ids}), 201
+
+@app.route('/flotte/associer', methods=['POST'])
+def flotte_associer():
+    """Associe des conducteurs à des voitures : {"paires": [[id_voiture, id_conducteur], ...]}"""
+    paires = corps_lot('paires')
+    if paires is None:
+        return jsonify({"erreur": f"Liste 'paires' attendue (au plus {MAX_LOT})"}), 400
+    try:
+        resultats = {str(v): flotte.associer(int(v), int(c)) for v, c in paires}
+    except (TypeError, ValueError) as e:
+        return jsonify({"erreur": f"Paire invalide : {e}"}), 400
+    return jsonify({"resultats": resultats})
+
+@app.route('/flotte/<action>', methods=['POST'])
+def flotte_action(action):
+    """
+    Applique une action (demarrer, accelerer, freiner, arreter) à un lot
+    de voitures : {"ids": [1, 2, ...]}. Résultat par voiture : true,
+    false (action refusée) ou null (voiture inconnue).
+    """
+    if action not in ACTIONS:
+        return jsonify({"erreur": f"Action inconnue : {action}"}), 404
+    ids = corps_lot('ids')
+    if ids is None or not all(isinstance(i, int) for i in ids):
+        return jsonify({"erreur": f"Liste 'ids' d'entiers attendue (au plus {MAX_LOT})"}), 400
+    resultats = flotte.executer(action, ids)
+    return jsonify({"resultats": {str(i): r for i, r in resultats.items()}})
+
+@app.route('/flotte/voitures/<int:id_voiture>')
+def flotte_voiture(id_voiture):
+    """État d'une voiture de la flotte"""
+    etat = flotte.etat(id_voiture)
+    if etat is None:
+        return jsonify({"erreur": "Voiture inconnue"}), 404
+    return jsonify(etat)
+
+@app.route('/flotte/evenements')
+def flotte_evenements():
+    """Journal des événements : ?depuis=<numéro>&limite=1000"""
+    depuis = request.args.get('depuis', 0, type=int)
+    limite = min(request.args.get('limite', 1000, type=int), MAX_LOT)
+    return jsonify({"evenements": flotte.journal.lire(depuis, limite)})
+
+@app.route('/flotte/stats')
+def flotte_stats():
+    return jsonify(flotte.statistiques())
+
+
 # POINT D'ENTRÉE DE L'APPLICATION
 # ================================
 if __name__ == '__main__':
@@ -0,0 +1,117 @@
+"""
+Benchmark de l'API de la flotte sous charge concurrente
+
+Crée une flotte de voitures (chacune avec un conducteur), puis plusieurs
+threads, chacun avec son propre client de test Flask, enchaînent les
+actions sur leurs voitures (démarrer, accélérer, freiner, arrêter) :
+    - unitaire : une requête POST /flotte/<action> par voiture
+    - lot      : une requête POST /flotte/<action> par lot de voitures
+
+Pour chaque mode : opérations (action sur une voiture) par seconde.
+Mesure aussi la mémoire par voiture créée par la flotte (Flotte.creer_voiture)
+comparée à une Voiture seule.
+
+Usage:
+    python benchmark_flotte.py
+    python benchmark_flotte.py --voitures 10000 --threads 1 4 16 --lot 500
+"""
+import argparse
+import gc
+import threading
+import time as chrono
+import tracemalloc
+
+import app as api
+from flotte import Flotte
+from voitures import Voiture
+
+CYCLE = ['demarrer', 'accelerer', 'freiner', 'arreter']
+
+
+def preparer_flotte(nb_voitures):
+    """Crée nb_voitures voitures avec chacune un conducteur ; retourne leurs ids"""
+    client = api.app.test_client()
+    voitures = [{'marque': 'Renault', 'modele': 'Clio', 'annee': 2023, 'couleur': 'Bleu'}]
+    conducteurs = [{'nom': 'Marie', 'permis': 'B'}]
+    ids = []
+    for debut in range(0, nb_voitures, api.MAX_LOT):
+        n = min(api.MAX_LOT, nb_voitures - debut)
+        ids_voitures = client.post('/flotte/voitures', json={'voitures': voitures * n}).get_json()['ids']
+        ids_conducteurs = client.post('/flotte/conducteurs', json={'conducteurs': conducteurs * n}).get_json()['ids']
+        client.post('/flotte/associer', json={'paires': list(zip(ids_voitures, ids_conducteurs))})
+        ids.extend(ids_voitures)
+    return ids
+
+
+def octets_par_voiture(creer, nb_voitures):
+    """Octets alloués par voiture (tracemalloc) pour nb_voitures appels à creer"""
+    gc.collect()
+    tracemalloc.start()
+    voitures = [creer() for _ in range(nb_voitures)]
+    octets, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del voitures
+    return octets / nb_voitures
+
+
+def mesurer_memoire(nb_voitures):
+    """Octets par voiture : Voiture seule et voiture créée par une flotte"""
+    flotte = Flotte()
+    return {
+        'Voiture': octets_par_voiture(lambda: Voiture("Renault", "Clio", 2023, "Bleu"), nb_voitures),
+        'Flotte': octets_par_voiture(lambda: flotte.creer_voiture("Renault", "Clio", 2023, "Bleu"),
+                                     nb_voitures),
+    }
+
+
+def travailleur(ids, taille_lot, tours, erreurs):
+    """Enchaîne tours cycles d'actions sur ids, par lots de taille_lot voitures"""
+    client = api.app.test_client()
+    for _ in range(tours):
+        for action in CYCLE:
+            for debut in range(0, len(ids), taille_lot):
+                reponse = client.post(f'/flotte/{action}', json={'ids': ids[debut:debut + taille_lot]})
+                if reponse.status_code != 200:
+                    erreurs.append(reponse.status_code)
+
+
+def mesurer(ids, nb_threads, taille_lot, tours):
+    """Opérations par seconde avec nb_threads threads se partageant ids"""
+    parts = [ids[i::nb_threads] for i in range(nb_threads)]
+    erreurs = []
+    threads = [threading.Thread(target=travailleur, args=(part, taille_lot, tours, erreurs))
+               for part in parts]
+    debut = chrono.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duree = chrono.perf_counter() - debut
+    if erreurs:
+        raise RuntimeError(f"{len(erreurs)} requêtes en erreur (codes {sorted(set(erreurs))})")
+    return len(ids) * len(CYCLE) * tours / duree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'API de la flotte")
+    parser.add_argument('--voitures', type=int, default=2000, help="Nombre de voitures")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8], help="Nombres de threads")
+    parser.add_argument('--lot', type=int, default=200, help="Voitures par requête en mode lot")
+    parser.add_argument('--tours', type=int, default=2, help="Cycles d'actions par voiture")
+    args = parser.parse_args()
+
+    for nom, octets in mesurer_memoire(args.voitures).items():
+        print(f"Mémoire par voiture ({nom}) : {octets:,.0f} octets")
+    ids = preparer_flotte(args.voitures)
+    print(f"{len(ids)} voitures, {args.tours} cycle(s) de {len(CYCLE)} actions par voiture")
+    print(f"{'threads':>8} {'unitaire (ops/s)':>18} {'lot (ops/s)':>14}")
+    for nb_threads in args.threads:
+        unitaire = mesurer(ids, nb_threads, 1, args.tours)
+        lot = mesurer(ids, nb_threads, args.lot, args.tours)
+        print(f"{nb_threads:>8} {unitaire:>18,.0f} {lot:>14,.0f}")
+    stats = api.flotte.statistiques()
+    print(f"Opérations : {stats['operations']:,}, événements en journal : {stats['evenements']:,}")
+
+
+if __name__ == '__main__':
+    main()
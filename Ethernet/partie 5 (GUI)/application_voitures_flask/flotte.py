@@ -0,0 +1,143 @@
+"""
+Flotte de voitures et de conducteurs partagée par les requêtes de l'API
+
+Chaque voiture et chaque conducteur reçoit un identifiant ; plusieurs
+clients peuvent ainsi piloter chacun leurs voitures sans se gêner. Les
+opérations sur une même voiture sont protégées par un verrou (un verrou
+pour un groupe de voitures : NB_VERROUS verrous pour toute la flotte).
+
+Les messages des voitures ne sont pas affichés (print) mais rangés dans
+un journal d'événements en mémoire, de taille bornée, consultable par
+l'API.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+from voitures import Voiture, Conducteur
+
+NB_VERROUS = 64
+TAILLE_JOURNAL = 100_000  # Événements gardés (les plus anciens sont oubliés)
+
+# Actions applicables à un lot de voitures : nom -> méthode de Voiture
+ACTIONS = {
+    'demarrer': Voiture.demarrer,
+    'accelerer': Voiture.accelerer,
+    'freiner': Voiture.freiner,
+    'arreter': Voiture.arreter,
+}
+
+
+class JournalEvenements:
+    """
+    Journal des événements en mémoire : les taille derniers événements
+    (numéro, instant, source, message). L'ajout ne prend pas de verrou
+    (deque.append et itertools.count sont atomiques en CPython).
+    """
+
+    def __init__(self, taille=TAILLE_JOURNAL):
+        self.evenements = deque(maxlen=taille)
+        self._numeros = itertools.count(1)
+
+    def ajouter(self, source, message):
+        self.evenements.append((next(self._numeros), time.time(), source, message))
+
+    def lire(self, depuis=0, limite=1000):
+        """Événements de numéro supérieur à depuis (au plus limite, les plus anciens d'abord)"""
+        evenements = list(self.evenements)  # Copie faite en une fois (sous le GIL)
+        resultat = []
+        for numero, instant, source, message in evenements:
+            if numero > depuis:
+                resultat.append({'numero': numero, 'instant': instant, 'source': source, 'message': message})
+                if len(resultat) >= limite:
+                    break
+        return resultat
+
+
+class Flotte:
+    """Voitures et conducteurs indexés par identifiant, utilisables depuis plusieurs threads"""
+
+    def __init__(self, journal=None):
+        self.journal = journal or JournalEvenements()
+        self.voitures = {}
+        self.conducteurs = {}
+        self._ids_voitures = itertools.count(1)
+        self._ids_conducteurs = itertools.count(1)
+        self._verrous = [threading.Lock() for _ in range(NB_VERROUS)]
+        self.operations = 0  # Actions exécutées (compteur protégé par _verrou_stats)
+        self._verrou_stats = threading.Lock()
+        # Journal commun à toutes les voitures (méthode liée créée une seule fois)
+        self._journal_voitures = self._journaliser_voiture
+
+    def _verrou(self, id_voiture):
+        return self._verrous[id_voiture % NB_VERROUS]
+
+    def creer_voiture(self, marque, modele, annee, couleur):
+        """Ajoute une voiture ; retourne son identifiant"""
+        id_voiture = next(self._ids_voitures)
+        self.voitures[id_voiture] = Voiture(marque, modele, annee, couleur,
+                                            journal=self._journal_voitures, source=id_voiture)
+        return id_voiture
+
+    def _journaliser_voiture(self, id_voiture, message):
+        self.journal.ajouter(f'voiture:{id_voiture}', message)
+
+    def creer_conducteur(self, nom, permis):
+        """Ajoute un conducteur ; retourne son identifiant"""
+        id_conducteur = next(self._ids_conducteurs)
+        self.conducteurs[id_conducteur] = Conducteur(nom, permis)
+        return id_conducteur
+
+    def associer(self, id_voiture, id_conducteur):
+        """Fait monter un conducteur dans une voiture ; False si l'un des deux est inconnu"""
+        voiture = self.voitures.get(id_voiture)
+        conducteur = self.conducteurs.get(id_conducteur)
+        if voiture is None or conducteur is None:
+            return False
+        with self._verrou(id_voiture):
+            voiture.set_conducteur(conducteur)
+        return True
+
+    def retirer_conducteur(self, id_voiture):
+        voiture = self.voitures.get(id_voiture)
+        if voiture is None:
+            return False
+        with self._verrou(id_voiture):
+            voiture.remove_conducteur()
+        return True
+
+    def executer(self, action, ids):
+        """
+        Applique une action (clé de ACTIONS) à un lot de voitures.
+
+        Returns:
+            dict id -> résultat de l'action (True/False), None si la voiture est inconnue
+        """
+        methode = ACTIONS[action]
+        resultats = {}
+        for id_voiture in ids:
+            voiture = self.voitures.get(id_voiture)
+            if voiture is None:
+                resultats[id_voiture] = None
+                continue
+            with self._verrou(id_voiture):
+                resultats[id_voiture] = methode(voiture)
+        with self._verrou_stats:
+            self.operations += len(resultats)
+        return resultats
+
+    def etat(self, id_voiture):
+        voiture = self.voitures.get(id_voiture)
+        if voiture is None:
+            return None
+        with self._verrou(id_voiture):
+            return dict(voiture.etat(), id=id_voiture)
+
+    def statistiques(self):
+        return {
+            'voitures': len(self.voitures),
+            'conducteurs': len(self.conducteurs),
+            'operations': self.operations,
+            'evenements': len(self.journal.evenements)
+        }
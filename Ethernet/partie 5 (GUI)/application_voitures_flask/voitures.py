@@ -1,84 +1,174 @@
-class Moteur:
+class Piece:
+    """
+    Pièce non modifiable (Moteur, Roue), partageable entre voitures :
+    partage() retourne une seule instance par caractéristiques
+    (poids-mouche). L'état qui change (moteur allumé...) est gardé par la
+    voiture, pas par la pièce.
+    """
+    __slots__ = ()
+    
+    def __init_subclass__(cls):
+        cls._partagees = {}
+    
+    @classmethod
+    def partage(cls, *caracteristiques):
+        piece = cls._partagees.get(caracteristiques)
+        if piece is None:
+            piece = cls._partagees.setdefault(caracteristiques, cls(*caracteristiques))
+        return piece
+    
+    def __setattr__(self, nom, valeur):
+        if hasattr(self, nom):
+            raise AttributeError(f"{type(self).__name__} n'est pas modifiable")
+        object.__setattr__(self, nom, valeur)
+
+
+class Moteur(Piece):
+    __slots__ = ('__puissance', '__type_carburant')
+    
     def __init__(self, puissance: int, type_carburant: str):
         self.__puissance = puissance
         self.__type_carburant = type_carburant
     
-    def allumer(self):
-        print(f"Moteur de {self.__puissance} CV allumé")
+    def allumer(self, journal=print):
+        journal(f"Moteur de {self.__puissance} CV allumé")
     
-    def eteindre(self):
-        print("Moteur éteint")
+    def eteindre(self, journal=print):
+        journal("Moteur éteint")
 
 
-class Roue:
+class Roue(Piece):
+    __slots__ = ('__taille', '__type')
+    
     def __init__(self, taille: int, type_roue: str):
         self.__taille = taille
         self.__type = type_roue
     
-    def tourner(self):
-        print(f"Roue de {self.__taille} pouces tourne")
+    def tourner(self, journal=print):
+        journal(f"Roue de {self.__taille} pouces tourne")
 
 
 class Conducteur:
+    __slots__ = ('__nom', '__permis')
+    
     def __init__(self, nom: str, permis: str):
         self.__nom = nom
         self.__permis = permis
     
-    def conduire(self):
-        print(f"{self.__nom} conduit")
+    def conduire(self, journal=print):
+        journal(f"{self.__nom} conduit")
     
-    def monter(self):
-        print(f"{self.__nom} monte dans la voiture")
+    def monter(self, journal=print):
+        journal(f"{self.__nom} monte dans la voiture")
     
-    def descendre(self):
-        print(f"{self.__nom} descend de la voiture")
+    def descendre(self, journal=print):
+        journal(f"{self.__nom} descend de la voiture")
+    
+    def etat(self):
+        return {"nom": self.__nom, "permis": self.__permis}
 
 
 class Voiture:
-    def __init__(self, marque: str, modele: str, annee: int, couleur: str):
+    """
+    Les messages (démarrage, accélération...) sont transmis à journal :
+    print par défaut, ou le journal d'événements de la flotte (API Flask).
+    Si source est donnée, journal est appelé avec (source, message) : un
+    même journal peut ainsi servir à toutes les voitures, chacune ne gardant
+    que sa source (son identifiant dans la flotte).
+    
+    Le moteur et les roues sont des pièces partagées (Piece.partage) :
+    toutes les voitures de même équipement utilisent les mêmes objets, et
+    une voiture ne garde que son propre état (__slots__, sans __dict__).
+    """
+    __slots__ = ('__marque', '__modele', '__annee', '__couleur', '__journal', '__source',
+                 '__en_marche', '__vitesse', '__moteur', '__roue', '__conducteur')
+    
+    VITESSE_PAR_ACCELERATION = 10  # km/h
+    NB_ROUES = 4
+    
+    def __init__(self, marque: str, modele: str, annee: int, couleur: str, journal=print, source=None):
         self.__marque = marque
         self.__modele = modele
         self.__annee = annee
         self.__couleur = couleur
+        self.__journal = journal
+        self.__source = source
+        self.__en_marche = False
+        self.__vitesse = 0
         
-        # Composition : le Moteur et les Roues sont créés avec la Voiture
-        self.__moteur = Moteur(puissance=150, type_carburant="Essence")
-        self.__roues = [Roue(taille=17, type_roue="Été") for _ in range(4)]
+        # Composition : le Moteur et les Roues sont attribués à la Voiture à sa
+        # création (pièces partagées : les 4 roues sont identiques)
+        self.__moteur = Moteur.partage(150, "Essence")
+        self.__roue = Roue.partage(17, "Été")
         
         # Agrégation : le Conducteur est optionnel et existe indépendamment
         self.__conducteur = None
     
+    def _journaliser(self, message):
+        """Transmet message au journal, avec la source de la voiture si elle en a une"""
+        if self.__source is None:
+            self.__journal(message)
+        else:
+            self.__journal(self.__source, message)
+    
     def set_conducteur(self, conducteur: Conducteur):
         """Agrégation : on associe un conducteur existant"""
         self.__conducteur = conducteur
         if conducteur:
-            conducteur.monter()
+            conducteur.monter(self._journaliser)
     
     def remove_conducteur(self):
         """Le conducteur quitte la voiture mais continue d'exister"""
         if self.__conducteur:
-            self.__conducteur.descendre()
+            self.__conducteur.descendre(self._journaliser)
             self.__conducteur = None
     
     def demarrer(self):
+        """Retourne True si la voiture a démarré (il faut un conducteur)"""
         if self.__conducteur:
-            self.__moteur.allumer()
-            print(f"{self.__marque} {self.__modele} démarre")
-        else:
-            print("Impossible de démarrer : pas de conducteur")
+            self.__moteur.allumer(self._journaliser)
+            self.__en_marche = True
+            self._journaliser(f"{self.__marque} {self.__modele} démarre")
+            return True
+        self._journaliser("Impossible de démarrer : pas de conducteur")
+        return False
     
     def arreter(self):
-        self.__moteur.eteindre()
-        print(f"{self.__marque} {self.__modele} s'arrête")
+        self.__moteur.eteindre(self._journaliser)
+        self.__en_marche = False
+        self.__vitesse = 0
+        self._journaliser(f"{self.__marque} {self.__modele} s'arrête")
+        return True
     
     def accelerer(self):
+        """Retourne True si la voiture a accéléré (il faut un conducteur)"""
         if self.__conducteur:
-            for roue in self.__roues:
-                roue.tourner()
-            print("La voiture accélère")
+            for _ in range(self.NB_ROUES):
+                self.__roue.tourner(self._journaliser)
+            self.__vitesse += self.VITESSE_PAR_ACCELERATION
+            self._journaliser("La voiture accélère")
+            return True
+        return False
     
     def freiner(self):
-        print("La voiture freine")
+        self.__vitesse = max(0, self.__vitesse - self.VITESSE_PAR_ACCELERATION)
+        self._journaliser("La voiture freine")
+        return True
+    
+    def a_conducteur(self):
+        return self.__conducteur is not None
+    
+    def etat(self):
+        """État de la voiture (dict sérialisable en JSON)"""
+        return {
+            "marque": self.__marque,
+            "modele": self.__modele,
+            "annee": self.__annee,
+            "couleur": self.__couleur,
+            "en_marche": self.__en_marche,
+            "vitesse": self.__vitesse,
+            "conducteur": self.__conducteur.etat() if self.__conducteur else None
+        }
 
 
 # Exemple d'utilisation
@@ -104,5 +194,5 @@ if __name__ == "__main__":
     conducteur.conduire()  # Le conducteur existe toujours
     
     print("\n=== Destruction de la voiture ===")
-    del ma_voiture  # Le moteur et les roues sont détruits avec la voiture
+    del ma_voiture  # La voiture et son état disparaissent (les pièces partagées restent)
     conducteur.conduire()  # Mais le conducteur existe toujours
@@ -1,28 +1,51 @@
-from flask import Flask, render_template
-import csv
+from flask import Flask, render_template, request, stream_template
+from datetime import date, datetime, timezone
+from hashlib import sha1
 from pathlib import Path                    # 1. Importez pathlib
-from voiture import Voiture
+import os
+from catalogue import Catalogue
+from depot_voitures import ouvrir_depot
 
 app = Flask(__name__)
 BASE_DIR = Path(__file__).parent            # 2. Définissez le répertoire de base
 CHEMIN_DU_CSV = BASE_DIR / 'voitures.csv'   # 3. Construisez le chemin complet vers le fichier CSV
+LIMITE_PAGE = 50                            # Voitures par page (?limite=)
+LIMITE_PAGE_MAX = 1000
 
-# Fonction pour charger les voitures depuis le CSV
-def charger_voitures(fichier_csv):
-    voitures = {}
-    with open(fichier_csv, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for index, row in enumerate(reader, start=1):
-            voitures[index] = Voiture(
-                marque=row['marque'],
-                modele=row['modele'],
-                annee=int(row['annee']),
-                couleur=row['couleur']
-            )
-    return voitures
-
-# Chargement des voitures depuis le fichier CSV
-voitures = charger_voitures(CHEMIN_DU_CSV)
+# Chargement des voitures depuis le fichier CSV, indexées par couleur,
+# marque et année ; le fichier est relu automatiquement s'il est modifié.
+# Si CATALOGUE_DB est défini (sqlite:///voitures.db, mysql://...), les
+# voitures sont lues dans cette base (importée avec depot_voitures.py).
+CATALOGUE_DB = os.environ.get('CATALOGUE_DB')
+if CATALOGUE_DB:
+    catalogue = ouvrir_depot(CATALOGUE_DB)
+else:
+    catalogue = Catalogue(CHEMIN_DU_CSV)
+    catalogue.demarrer_surveillance()
+
+# Affichage d'une liste de voitures page par page (?apres=<id>&limite=50).
+# La page est envoyée au fur et à mesure du rendu du template (streaming).
+# ETag et Last-Modified dépendent de la version du catalogue : si la page
+# n'a pas changé depuis la visite précédente, le navigateur reçoit une
+# réponse 304 (sans contenu) et la page n'est pas re-générée.
+def afficher_liste(voitures):
+    version = voitures.version
+    etag = sha1(f'{version} {request.full_path}'.encode('utf-8')).hexdigest()[:20]
+    modifie_le = datetime.fromtimestamp(int(voitures.modifie_le), timezone.utc)
+    entetes = {'ETag': f'"{etag}"', 'Last-Modified': modifie_le.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+               'Cache-Control': 'no-cache'}
+    
+    if request.if_none_match:
+        inchangee = request.if_none_match.contains(etag)
+    else:
+        inchangee = request.if_modified_since is not None and modifie_le <= request.if_modified_since
+    if inchangee:
+        return '', 304, entetes
+    
+    apres = request.args.get('apres', type=int)
+    limite = min(max(request.args.get('limite', LIMITE_PAGE, type=int), 1), LIMITE_PAGE_MAX)
+    page, suivant = voitures.page(apres, limite)
+    return stream_template('liste.html', voitures=page, suivant=suivant, limite=limite), entetes
 
 # Route 1: Page d'accueil
 @app.route('/')
@@ -32,12 +55,12 @@ def accueil():
 # Route 2: Liste de toutes les voitures
 @app.route('/voitures')
 def liste_voitures():
-    return render_template('liste.html', voitures=voitures)
+    return afficher_liste(catalogue.voitures)
 
 # Route 3: Détail d'une voiture spécifique
 @app.route('/voiture/<int:id>')
 def detail_voiture(id):
-    voiture = voitures.get(id)
+    voiture = catalogue.get(id)
     if voiture:
         return render_template('voiture.html', voiture=voiture, id=id)
     return "Voiture non trouvée", 404
@@ -45,8 +68,20 @@ def detail_voiture(id):
 # Route 4: Recherche par couleur
 @app.route('/couleur/<couleur>')
 def par_couleur(couleur):
-    resultats = {id: v for id, v in voitures.items() if v.couleur == couleur}
-    return render_template('liste.html', voitures=resultats)
+    resultats = catalogue.par_couleur(couleur)
+    return afficher_liste(resultats)
+
+# Route 5: Recherche par intervalle d'années (bornes incluses)
+@app.route('/annees/<int:debut>/<int:fin>')
+def par_annees(debut, fin):
+    resultats = catalogue.par_annee(debut, fin)
+    return afficher_liste(resultats)
+
+# Route 6: Voitures de moins de <age_max> ans (l'année courante est lue une fois par requête)
+@app.route('/recentes/<int:age_max>')
+def recentes(age_max):
+    resultats = catalogue.par_age(date.today().year, age_max=age_max)
+    return afficher_liste(resultats)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,371 @@
+"""
+Module contenant la classe Catalogue : les voitures du fichier CSV,
+rangées en colonnes, et leurs index de recherche
+
+Les voitures ne sont pas gardées sous forme d'objets : chaque attribut
+est une colonne (tableau NumPy d'entiers). Les années sont stockées
+telles quelles ; la marque, le modèle et la couleur sont encodés par
+dictionnaire (code entier de la valeur dans la liste des valeurs
+distinctes). Une Voiture n'est créée qu'à la lecture d'une ligne.
+
+Chaque voiture reçoit un identifiant (numéro de ligne, à partir de 1).
+Les index de recherche (couleur, marque, année) sont des permutations
+des lignes triées par valeur : une recherche par valeur ou par
+intervalle d'années est une recherche dichotomique (np.searchsorted)
+qui ne parcourt que les voitures trouvées. Les calculs sur une colonne
+entière (âges, filtres) sont vectorisés.
+
+Le fichier CSV est surveillé (date de modification) par un thread en
+arrière-plan. Si des lignes ont seulement été ajoutées à la fin, seules
+ces lignes sont lues ; sinon tout le fichier est rechargé. Les nouvelles
+données sont construites à part puis remplacent les anciennes d'un seul
+coup : une requête en cours voit toujours un catalogue complet.
+"""
+import csv
+import io
+import os
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+from voiture import Voiture
+
+INTERVALLE_SURVEILLANCE = 2.0  # Période de vérification du fichier CSV (s)
+ATTRIBUTS = ('marque', 'modele', 'annee', 'couleur')
+ATTRIBUTS_TEXTE = ('marque', 'modele', 'couleur')
+
+
+class ColonneTexte:
+    """Colonne de texte encodée par dictionnaire : codes (int32) et valeurs distinctes"""
+    __slots__ = ('codes', 'valeurs', 'index_valeurs')
+
+    def __init__(self, codes=None, valeurs=None, index_valeurs=None):
+        self.codes = codes if codes is not None else np.empty(0, dtype=np.int32)
+        self.valeurs = valeurs if valeurs is not None else []
+        self.index_valeurs = index_valeurs if index_valeurs is not None else {}
+
+    def avec_ajouts(self, textes):
+        """Nouvelle colonne : celle-ci suivie des textes (le dictionnaire n'est copié que s'il grandit)"""
+        valeurs, index_valeurs = self.valeurs, self.index_valeurs
+        if not index_valeurs.keys() >= set(textes):
+            valeurs, index_valeurs = list(valeurs), dict(index_valeurs)
+            for texte in textes:
+                if texte not in index_valeurs:
+                    index_valeurs[texte] = len(valeurs)
+                    valeurs.append(texte)
+        codes = np.fromiter((index_valeurs[texte] for texte in textes), dtype=np.int32, count=len(textes))
+        return ColonneTexte(np.concatenate((self.codes, codes)), valeurs, index_valeurs)
+
+    def code(self, valeur):
+        """Code d'une valeur (-1 si absente de la colonne)"""
+        return self.index_valeurs.get(valeur, -1)
+
+
+class DonneesCatalogue:
+    """
+    Contenu du catalogue à un instant donné (jamais modifié une fois
+    publié) : une colonne par attribut. Les index de recherche sont
+    calculés à la première recherche qui en a besoin. version identifie
+    le fichier lu (date de modification et taille), modifie_le est sa
+    date de modification (secondes depuis l'epoch).
+    """
+
+    def __init__(self, colonnes=None, annee=None):
+        self.colonnes = colonnes or {nom: ColonneTexte() for nom in ATTRIBUTS_TEXTE}
+        self.annee = annee if annee is not None else np.empty(0, dtype=np.int32)
+        self.version = ''
+        self.modifie_le = None
+        self._index = {}
+        self._rangs = {}
+
+    def __len__(self):
+        return len(self.annee)
+
+    def voiture(self, ligne):
+        """Voiture de la ligne (vue créée à la demande)"""
+        marque, modele, couleur = (self.colonnes[nom] for nom in ATTRIBUTS_TEXTE)
+        return Voiture(marque.valeurs[marque.codes[ligne]], modele.valeurs[modele.codes[ligne]],
+                       int(self.annee[ligne]), couleur.valeurs[couleur.codes[ligne]])
+
+    def avec_ajouts(self, lignes):
+        """Nouveau contenu : celui-ci suivi des lignes (n-uplets marque, modele, annee, couleur)"""
+        if not lignes:
+            return self
+        marques, modeles, annees, couleurs = zip(*lignes)
+        colonnes = {nom: self.colonnes[nom].avec_ajouts(textes)
+                    for nom, textes in zip(ATTRIBUTS_TEXTE, (marques, modeles, couleurs))}
+        annee = np.concatenate((self.annee, np.array(annees, dtype=np.int32)))
+        return DonneesCatalogue(colonnes, annee)
+
+    def _trie(self, nom):
+        """Index d'une colonne : (lignes triées par valeur, valeurs triées), tri stable"""
+        index = self._index.get(nom)
+        if index is None:
+            valeurs = self.annee if nom == 'annee' else self.colonnes[nom].codes
+            ordre = np.argsort(valeurs, kind='stable')
+            index = self._index[nom] = (ordre, valeurs[ordre])
+        return index
+
+    def lignes_entre(self, nom, debut=None, fin=None):
+        """Lignes dont la valeur (code ou année) est comprise entre debut et fin inclus, par valeur croissante"""
+        ordre, tries = self._trie(nom)
+        i = 0 if debut is None else np.searchsorted(tries, debut, side='left')
+        j = len(tries) if fin is None else np.searchsorted(tries, fin, side='right')
+        return ordre[i:j]
+
+    def rangs(self, nom):
+        """Position de chaque ligne dans l'index d'une colonne (permutation inverse, calculée une fois)"""
+        rangs = self._rangs.get(nom)
+        if rangs is None:
+            ordre = self._trie(nom)[0]
+            rangs = np.empty(len(ordre), dtype=np.intp)
+            rangs[ordre] = np.arange(len(ordre))
+            self._rangs[nom] = rangs
+        return rangs
+
+
+class VueVoitures(Mapping):
+    """
+    Voitures d'un catalogue (toutes, ou les lignes données), vues comme
+    un dict id -> Voiture ; les objets Voiture sont créés au parcours.
+    triees indique que les lignes sont dans l'ordre des identifiants ;
+    sinon elles sont une tranche consécutive de l'index de la colonne
+    index, parcourue dans le sens sens (1 ou -1).
+    """
+
+    def __init__(self, donnees, lignes=None, triees=False, index=None, sens=1):
+        self.donnees = donnees
+        self.lignes = lignes
+        self.triees = triees or lignes is None
+        self.index = index
+        self.sens = sens
+        self._ensemble = None
+
+    @property
+    def version(self):
+        return self.donnees.version
+
+    @property
+    def modifie_le(self):
+        return self.donnees.modifie_le
+
+    def _lignes(self):
+        return range(len(self.donnees)) if self.lignes is None else self.lignes.tolist()
+
+    def __len__(self):
+        return len(self.donnees) if self.lignes is None else len(self.lignes)
+
+    def __iter__(self):
+        return (ligne + 1 for ligne in self._lignes())
+
+    def __getitem__(self, id):
+        ligne = id - 1
+        if self.lignes is not None:
+            if self._ensemble is None:
+                self._ensemble = set(self.lignes.tolist())
+            if ligne not in self._ensemble:
+                raise KeyError(id)
+        elif not 0 <= ligne < len(self.donnees):
+            raise KeyError(id)
+        return self.donnees.voiture(ligne)
+
+    def items(self):
+        return ((ligne + 1, self.donnees.voiture(ligne)) for ligne in self._lignes())
+
+    def values(self):
+        return (self.donnees.voiture(ligne) for ligne in self._lignes())
+
+    def page(self, apres=None, limite=50):
+        """
+        Page de limite voitures suivant l'identifiant apres (curseur ; depuis
+        le début si None), dans l'ordre de la vue.
+
+        Returns:
+            (VueVoitures de la page, curseur de la page suivante ou None)
+        """
+        lignes = np.arange(len(self.donnees)) if self.lignes is None else self.lignes
+        if apres is None:
+            debut = 0
+        elif self.triees:
+            debut = int(np.searchsorted(lignes, apres))  # Première ligne d'identifiant > apres
+        elif len(lignes) and 1 <= apres <= len(self.donnees):
+            # Position du curseur dans l'index (sans parcourir la vue) : la
+            # page commence juste après, qu'il soit dans la vue ou non
+            rangs = self.donnees.rangs(self.index)
+            position = (int(rangs[apres - 1]) - int(rangs[lignes[0]])) * self.sens
+            debut = min(max(position + 1, 0), len(lignes))
+        else:
+            debut = len(lignes)
+        page = lignes[debut:debut + limite]
+        suivant = int(page[-1]) + 1 if debut + limite < len(lignes) else None
+        return VueVoitures(self.donnees, page, self.triees, self.index, self.sens), suivant
+
+    def ages(self, annee_courante):
+        """Âge de chaque voiture (tableau, dans l'ordre du parcours)"""
+        annee = self.donnees.annee if self.lignes is None else self.donnees.annee[self.lignes]
+        return annee_courante - annee
+
+
+class Catalogue:
+    """
+    Voitures d'un fichier CSV (colonnes marque, modele, annee, couleur),
+    indexées par couleur, marque et année.
+    """
+
+    def __init__(self, chemin_csv):
+        self.chemin_csv = chemin_csv
+        self.donnees = DonneesCatalogue()
+        self._signature = None  # (date de modification, taille) du fichier chargé
+        self._position = 0  # Fin de la dernière ligne lue (octets)
+        self._derniere_ligne = b''
+        self._colonnes = None
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._thread = None
+        self.charger()
+
+    # Recherches
+
+    def get(self, id):
+        donnees = self.donnees
+        return donnees.voiture(id - 1) if 1 <= id <= len(donnees) else None
+
+    @property
+    def voitures(self):
+        """Toutes les voitures (dict id -> Voiture)"""
+        return VueVoitures(self.donnees)
+
+    def _par_valeur(self, nom, valeur):
+        donnees = self.donnees
+        code = donnees.colonnes[nom].code(valeur)
+        return VueVoitures(donnees, donnees.lignes_entre(nom, code, code), triees=True)
+
+    def par_couleur(self, couleur):
+        return self._par_valeur('couleur', couleur)
+
+    def par_marque(self, marque):
+        return self._par_valeur('marque', marque)
+
+    def par_annee(self, debut=None, fin=None):
+        """Voitures dont l'année est comprise entre debut et fin (bornes incluses), par année croissante"""
+        donnees = self.donnees
+        return VueVoitures(donnees, donnees.lignes_entre('annee', debut, fin), index='annee')
+
+    def par_age(self, annee_courante, age_min=None, age_max=None):
+        """
+        Voitures dont l'âge est compris entre age_min et age_max (bornes
+        incluses), des plus récentes aux plus anciennes
+        """
+        debut = None if age_max is None else annee_courante - age_max
+        fin = None if age_min is None else annee_courante - age_min
+        donnees = self.donnees
+        return VueVoitures(donnees, donnees.lignes_entre('annee', debut, fin)[::-1], index='annee', sens=-1)
+
+    # Chargement
+
+    def charger(self):
+        """Charge tout le fichier CSV"""
+        with self._verrou:
+            with open(self.chemin_csv, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                contenu = f.read()
+            self._colonnes = None
+            lignes, fin = self._lire(contenu, complet=True)
+            self._publier(DonneesCatalogue().avec_ajouts(lignes), stat)
+            self._position = 0
+            self._fin_lecture(contenu[:fin], stat)
+
+    def recharger_si_modifie(self):
+        """
+        Relit le fichier CSV s'il a été modifié depuis le dernier chargement :
+        seulement les lignes ajoutées si le début du fichier est inchangé
+        (une dernière ligne incomplète est lue au rechargement suivant).
+
+        Returns:
+            True si le fichier a été relu
+        """
+        stat = os.stat(self.chemin_csv)
+        if (stat.st_mtime_ns, stat.st_size) == self._signature:
+            return False
+        with self._verrou:
+            ajout = None
+            if self._colonnes is not None and self._derniere_ligne.endswith(b'\n'):
+                with open(self.chemin_csv, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    f.seek(max(self._position - len(self._derniere_ligne), 0))
+                    if (stat.st_size >= self._position
+                            and f.read(len(self._derniere_ligne)) == self._derniere_ligne):
+                        ajout = f.read()
+            if ajout is not None:
+                lignes, fin = self._lire(ajout, complet=False)
+                if lignes:
+                    self._publier(self.donnees.avec_ajouts(lignes), stat)
+                self._fin_lecture(ajout[:fin], stat)
+                return True
+        self.charger()
+        return True
+
+    def _lire(self, contenu, complet):
+        try:
+            return self._lire_voitures(contenu, complet)
+        except Exception:
+            # Lecture interrompue : le prochain rechargement relira tout le fichier
+            self._colonnes = None
+            raise
+
+    def _lire_voitures(self, contenu, complet):
+        """
+        Voitures des lignes de contenu (toutes si complet, sinon seulement
+        les lignes terminées par un retour à la ligne). La première ligne du
+        fichier est l'en-tête ; les lignes vides sont ignorées.
+
+        Returns:
+            (liste de n-uplets (marque, modele, annee, couleur), nombre d'octets lus)
+        """
+        fin = len(contenu) if complet else contenu.rfind(b'\n') + 1
+        lignes = csv.reader(io.StringIO(contenu[:fin].decode('utf-8')))
+        if self._colonnes is None:
+            entete = next(lignes, None) or []
+            self._colonnes = [entete.index(nom) for nom in ATTRIBUTS]
+        i_marque, i_modele, i_annee, i_couleur = self._colonnes
+        voitures = [(valeurs[i_marque], valeurs[i_modele], int(valeurs[i_annee]), valeurs[i_couleur])
+                    for valeurs in lignes if valeurs]
+        return voitures, fin
+
+    def _publier(self, donnees, stat):
+        """Remplace le contenu du catalogue (une seule affectation)"""
+        donnees.version = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+        donnees.modifie_le = stat.st_mtime
+        self.donnees = donnees
+
+    def _fin_lecture(self, lu, stat):
+        """Mémorise la position atteinte et la dernière ligne lue"""
+        self._position += len(lu)
+        if lu:
+            self._derniere_ligne = lu[lu.rfind(b'\n', 0, len(lu) - 1) + 1:]
+        self._signature = (stat.st_mtime_ns, stat.st_size)
+
+    # Surveillance du fichier
+
+    def demarrer_surveillance(self, intervalle=INTERVALLE_SURVEILLANCE):
+        """Vérifie le fichier CSV toutes les intervalle secondes dans un thread"""
+        if self._thread is not None:
+            return
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._surveiller, args=(intervalle,), daemon=True)
+        self._thread.start()
+
+    def arreter_surveillance(self):
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _surveiller(self, intervalle):
+        while not self._arret.wait(intervalle):
+            try:
+                self.recharger_si_modifie()
+            except Exception as e:
+                # Fichier en cours d'écriture ou invalide : on garde le catalogue actuel
+                print(f"Rechargement de {self.chemin_csv} impossible : {e}")
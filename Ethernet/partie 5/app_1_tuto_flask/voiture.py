@@ -1,8 +1,11 @@
 """
 Module contenant la classe Voiture
 """
+from datetime import date
 
 class Voiture:
+    __slots__ = ('marque', 'modele', 'annee', 'couleur')  # Pas de __dict__ par voiture
+    
     def __init__(self, marque, modele, annee, couleur):
         self.marque = marque
         self.modele = modele
@@ -12,7 +15,8 @@ class Voiture:
     def __repr__(self):
         return f"{self.marque} {self.modele} ({self.annee})"
     
-    def age(self):
-        """Calcule l'âge de la voiture"""
-        from datetime import datetime
-        return datetime.now().year - self.annee
+    def age(self, annee_courante=None):
+        """Calcule l'âge de la voiture (année courante calculée si non fournie)"""
+        if annee_courante is None:
+            annee_courante = date.today().year
+        return annee_courante - self.annee
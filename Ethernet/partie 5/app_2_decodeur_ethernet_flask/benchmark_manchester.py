@@ -0,0 +1,154 @@
+"""
+Benchmark du décodage Manchester : implémentation de référence (boucle
+Python, front par front) vs version vectorisée (decode_manchester)
+
+L'implémentation de référence applique les règles actuelles de
+mid_bit_edges (fronts du milieu des bits repérés par les intervalles d'un
+bit) ; ce n'est plus la boucle d'origine, qui retenait tout front suivi
+d'un intervalle d'environ un demi-bit. « Identique » compare donc la
+version vectorisée à ces règles, pas au décodage d'origine.
+
+La sortie diffère volontairement de celle de la boucle d'origine : elle
+retenait aussi les fronts entre deux bits égaux, qui ne portent pas de
+donnée, et produisait des bits en trop (trames au FCS invalide). Ces fronts
+sont maintenant écartés.
+
+Les deux versions reçoivent le même seuil (seuillage à hystérésis,
+HysteresisSlicer, si None) : seul le décodage des fronts diffère.
+
+Usage:
+    python benchmark_manchester.py                 # 1M, 10M et 100M échantillons
+    python benchmark_manchester.py 1e6 5e6         # tailles personnalisées
+"""
+import sys
+import time as chrono
+
+import numpy as np
+
+from app import decode_manchester
+from decodeurManchester import HysteresisSlicer, SLICER_BLOCK_BITS
+
+
+def generer_signal_manchester(num_samples, sample_rate=1e9, bit_rate=10e6, bruit=0.05, seed=0):
+    """
+    Génère un signal Manchester synthétique (bits aléatoires + bruit gaussien)
+
+    Returns:
+        (signal, time) deux tableaux NumPy de num_samples échantillons
+    """
+    rng = np.random.default_rng(seed)
+    samples_per_half_bit = int(sample_rate / bit_rate / 2)
+    num_bits = num_samples // (2 * samples_per_half_bit) + 1
+    bits = rng.integers(0, 2, num_bits)
+
+    # Bit 1 = haut puis bas (front descendant), bit 0 = bas puis haut
+    halves = np.empty(2 * num_bits)
+    halves[0::2] = np.where(bits == 1, 1.0, -1.0)
+    halves[1::2] = -halves[0::2]
+    signal = np.repeat(halves, samples_per_half_bit)[:num_samples]
+    signal += rng.normal(0.0, bruit, num_samples)
+    time = np.arange(num_samples) / sample_rate
+    return signal, time
+
+
+def decode_manchester_reference(signal, time, sample_rate=1e9, bit_rate=10e6, threshold=None):
+    """
+    Implémentation de référence des règles de mid_bit_edges, front par front
+    (boucle Python), avec le même seuillage que decode_manchester (seuil
+    fixe, ou HysteresisSlicer)
+    """
+    bit_period = 1.0 / bit_rate
+    half_bit_period = bit_period / 2
+    samples_per_half_bit = int(half_bit_period * sample_rate)
+
+    if threshold is None:
+        slicer = HysteresisSlicer(int(bit_period * sample_rate) * SLICER_BLOCK_BITS)
+        digital = slicer.feed(signal).astype(int)
+    else:
+        digital = (signal > threshold).astype(int)
+
+    transitions = np.diff(digital)
+    rising_edges = np.where(transitions == 1)[0]
+    falling_edges = np.where(transitions == -1)[0]
+    all_edges = np.sort(np.concatenate([rising_edges, falling_edges]))
+
+    # Fronts du milieu des bits, classés front par front : repère donné par
+    # le dernier intervalle d'un bit, ou en début de trame par le suivant
+    # (mêmes règles que mid_bit_edges)
+    samples_per_bit = 2 * samples_per_half_bit
+    intervals = np.diff(all_edges)
+
+    def demi(k):
+        return 0.25 * samples_per_bit < intervals[k] < 0.75 * samples_per_bit
+
+    def complet(k):
+        return 0.75 * samples_per_bit <= intervals[k] < 1.25 * samples_per_bit
+
+    bits = []
+    bit_times = []
+    bit_positions = []
+
+    phase = None  # 0 : front du milieu d'un bit, 1 : front entre deux bits
+    for i in range(len(all_edges)):
+        if i > 0:
+            if complet(i - 1):
+                phase = 0
+            elif demi(i - 1) and phase is not None:
+                phase ^= 1
+            else:
+                phase = None
+        if phase is None:
+            k = i
+            while k < len(intervals) and demi(k):
+                k += 1
+            if k < len(intervals) and complet(k):
+                phase = (k - i) % 2
+        if phase == 0:
+            edge_pos = all_edges[i]
+            if digital[edge_pos] == 0 and digital[edge_pos + 1] == 1:
+                bits.append(0)
+            else:
+                bits.append(1)
+            bit_times.append(time[edge_pos])
+            bit_positions.append(edge_pos)
+
+    return {
+        'bits': bits,
+        'bit_times': bit_times,
+        'bit_positions': bit_positions,
+        'num_bits': len(bits),
+        'digital_signal': digital.tolist()
+    }
+
+
+def mesurer(fonction, *args):
+    """Retourne (résultat, durée en secondes) d'un appel"""
+    debut = chrono.perf_counter()
+    resultat = fonction(*args)
+    return resultat, chrono.perf_counter() - debut
+
+
+def main(tailles, threshold=None):
+    print(f"{'Échantillons':>14} | {'Référence (s)':>13} | {'Vectorisé (s)':>13} | {'Gain':>7} | Identique")
+    print('-' * 69)
+    for num_samples in tailles:
+        signal, time = generer_signal_manchester(num_samples)
+
+        # Mêmes arguments (fréquence, débit, seuil) pour les deux versions
+        args = (signal, time, 1e9, 10e6, threshold)
+        reference, duree_reference = mesurer(decode_manchester_reference, *args)
+        resultat, duree_vecto = mesurer(decode_manchester, *args)
+
+        identique = (
+            reference['bits'] == resultat['bits'].tolist()
+            and reference['bit_positions'] == resultat['bit_positions'].tolist()
+            and reference['bit_times'] == resultat['bit_times'].tolist()
+            and np.array_equal(reference['digital_signal'], resultat['digital'])
+        )
+        print(f"{num_samples:>14,} | {duree_reference:>13.3f} | {duree_vecto:>13.3f} | "
+              f"{duree_reference / duree_vecto:>6.1f}x | {'oui' if identique else 'NON'}")
+
+
+if __name__ == '__main__':
+    tailles = [int(float(arg)) for arg in sys.argv[1:]] or [1_000_000, 10_000_000, 100_000_000]
+    main(tailles)
@@ -0,0 +1,326 @@
+"""
+Benchmark du décodage Ethernet, étape par étape et de bout en bout
+
+Chaque étape est mesurée sur des captures synthétiques (trames Ethernet
+valides, FCS compris, encodées en Manchester et bruitées) pour plusieurs
+tailles et fréquences d'échantillonnage :
+    - decode_manchester      : seuillage et décodage des bits
+    - segment_frames         : découpage en trames
+    - bits_to_bytes          : conversion des bits de chaque trame en octets
+    - decode_ethernet_frame  : dissection complète de chaque trame
+    - decode_frames          : octets + FCS + en-tête Ethernet de toutes les trames
+    - pipeline               : decode_capture + réponse JSON (capture en mémoire)
+    - upload, upload_stream  : route /upload (CSV complet, puis lecture par blocs)
+
+Pour chaque mesure : meilleur temps sur plusieurs répétitions (et temps
+par échantillon), pic mémoire et nombre de blocs mémoire restant alloués
+(tracemalloc, lors d'une exécution séparée non chronométrée).
+
+Chaque capture est aussi vérifiée de bout en bout : ses trames, décodées
+par decode_capture (capture en mémoire) et par ManchesterStreamDecoder
+(lecture par blocs), doivent avoir un FCS valide, sauf la dernière qui peut
+être coupée par la fin de la capture. Le seuillage (HysteresisSlicer)
+de la capture fournie en blocs de tailles quelconques doit aussi être
+identique à celui de la capture fournie d'un bloc. Sinon le benchmark
+échoue.
+
+Usage:
+    python benchmark_pipeline.py                                    # 10k à 10M échantillons
+    python benchmark_pipeline.py --tailles 1e4 1e6 1e8 --frequences 1e9
+    python benchmark_pipeline.py --sortie reference.json             # enregistrer une référence
+    python benchmark_pipeline.py --reference reference.json --seuil 0.2
+"""
+import argparse
+import json
+import platform
+import struct
+import sys
+import time as chrono
+import tracemalloc
+import zlib
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+
+import app as decodeur
+from lecteurCSVOscillo import BaseDeTemps
+from decodeurManchester import decode_manchester, segment_frames, HysteresisSlicer, SLICER_BLOCK_BITS
+from decodeurEthernet import (bits_to_bytes, decode_ethernet_frame, decode_frames, frames_to_bytes,
+                              validate_fcs_batch)
+
+ETAPES = ['decode_manchester', 'segment_frames', 'bits_to_bytes', 'decode_ethernet_frame',
+          'decode_frames', 'pipeline', 'upload', 'upload_stream']
+TAILLES = [10_000, 100_000, 1_000_000, 10_000_000]
+FREQUENCES = [1e9, 2e8]
+DEBIT = 10e6
+PARAMS = {'sample_rate': None, 'bit_rate': DEBIT, 'drop_bad_fcs': False, 'differential': False}
+UPLOAD_MAX = 1_000_000  # Au-delà, le CSV à envoyer est trop long à générer
+BLOC_FLUX = 1_000_000  # Échantillons par bloc pour la vérification du décodage par blocs
+BLOCS_SEUILLAGE = (777, 1, 4093, 65537)  # Tailles des blocs (en boucle) pour la vérification du seuillage
+ECART_TRAMES = 96  # Silence entre trames (durées de bit, IFG 802.3)
+
+
+def trame_ethernet(rng):
+    """Trame Ethernet II aléatoire : préambule, SFD, en-tête, données, FCS"""
+    corps = (rng.bytes(6) + rng.bytes(6) + struct.pack('>H', 0x0800)
+             + rng.bytes(int(rng.integers(46, 1501))))
+    return bytes([0x55] * 7 + [0xD5]) + corps + struct.pack('<I', zlib.crc32(corps))
+
+
+def generer_capture_ethernet(num_samples, sample_rate=1e9, bit_rate=DEBIT, bruit=0.05, seed=0):
+    """
+    Génère une capture de num_samples échantillons : trames Ethernet
+    séparées de ECART_TRAMES durées de bit au niveau bas.
+
+    Returns:
+        signal (tableau float32)
+    """
+    rng = np.random.default_rng(seed)
+    samples_per_half_bit = int(sample_rate / bit_rate / 2)
+    demi_bits_max = num_samples // samples_per_half_bit + 1
+    morceaux, total = [], 0
+    while total < demi_bits_max:
+        bits = np.unpackbits(np.frombuffer(trame_ethernet(rng), dtype=np.uint8), bitorder='little')
+        demi_bits = np.empty(2 * len(bits), dtype=np.float32)
+        demi_bits[0::2] = np.where(bits == 1, 1.0, -1.0)
+        demi_bits[1::2] = -demi_bits[0::2]
+        morceaux.append(np.full(2 * ECART_TRAMES, -1.0, dtype=np.float32))
+        morceaux.append(demi_bits)
+        total += 2 * ECART_TRAMES + len(demi_bits)
+
+    signal = np.repeat(np.concatenate(morceaux), samples_per_half_bit)[:num_samples]
+    signal += rng.normal(0.0, bruit, num_samples).astype(np.float32)
+    return signal
+
+
+def capture_csv(signal, sample_rate):
+    """Contenu d'un fichier CSV d'oscilloscope (format Tektronix) pour le signal"""
+    flux = BytesIO()
+    flux.write(f'Model,MDO3014\nRecord Length,{len(signal)}\n'
+               f'Sample Interval,{1 / sample_rate:g}\nTIME,CH1\n'.encode('ascii'))
+    temps = np.arange(len(signal)) / sample_rate
+    np.savetxt(flux, np.column_stack((temps, signal)), delimiter=',', fmt='%.6e')
+    return flux.getvalue()
+
+
+def verifier_seuillage(signal, sample_rate):
+    """
+    Seuille la capture d'un bloc puis en blocs de tailles BLOCS_SEUILLAGE
+
+    Returns:
+        True si les deux seuillages sont identiques
+    """
+    bloc = int(sample_rate / DEBIT) * SLICER_BLOCK_BITS
+    reference = HysteresisSlicer(bloc).feed(signal)
+    slicer, morceaux, debut = HysteresisSlicer(bloc), [], 0
+    while debut < len(signal):
+        taille = BLOCS_SEUILLAGE[len(morceaux) % len(BLOCS_SEUILLAGE)]
+        morceaux.append(slicer.feed(signal[debut:debut + taille]))
+        debut += taille
+    return np.array_equal(np.concatenate(morceaux), reference)
+
+
+def verifier_trames(signal, sample_rate):
+    """
+    Décode la capture par decode_capture et par ManchesterStreamDecoder,
+    vérifie le FCS de ses trames et le seuillage par blocs (verifier_seuillage)
+
+    Returns:
+        (nombre de trames, trames valides en mémoire, trames valides par
+        blocs, seuillage indépendant du découpage en blocs)
+    """
+    temps = np.arange(len(signal)) / sample_rate
+    resultat = decodeur.decode_capture(temps, signal, sample_rate, DEBIT, with_plot=False)
+    flux = decodeur.ManchesterStreamDecoder(sample_rate, DEBIT, with_plot=False)
+    for debut in range(0, len(signal), BLOC_FLUX):
+        flux.feed(temps[debut:debut + BLOC_FLUX], signal[debut:debut + BLOC_FLUX])
+    resultat_flux = flux.finish()
+    return (len(resultat['frame_spans']),
+            validate_fcs_batch(frames_to_bytes(resultat['bits'], resultat['frame_spans']))['valid'],
+            validate_fcs_batch(frames_to_bytes(resultat_flux['bits'], resultat_flux['frame_spans']))['valid'],
+            verifier_seuillage(signal, sample_rate))
+
+
+def preparer_etapes(num_samples, sample_rate):
+    """
+    Construit les étapes à mesurer pour une capture : dict nom -> fonction
+    sans argument. Les entrées de chaque étape sont calculées une fois ici.
+
+    Returns:
+        (étapes, vérification des trames : voir verifier_trames)
+    """
+    signal = generer_capture_ethernet(num_samples, sample_rate)
+    temps = BaseDeTemps(0.0, 1.0 / sample_rate, num_samples)
+    decoded = decode_manchester(signal, temps, sample_rate, DEBIT)
+    spans = segment_frames(decoded, temps, sample_rate, DEBIT)
+    bits = decoded['bits']
+    tranches = [bits[a:b] for a, b, _, _ in spans]
+    octets = [bits_to_bytes(tranche) for tranche in tranches]
+
+    etapes = {
+        'decode_manchester': lambda: decode_manchester(signal, temps, sample_rate, DEBIT),
+        'segment_frames': lambda: segment_frames(decoded, temps, sample_rate, DEBIT),
+        'bits_to_bytes': lambda: [bits_to_bytes(tranche) for tranche in tranches],
+        'decode_ethernet_frame': lambda: [decode_ethernet_frame(trame, dissect=True) for trame in octets],
+        'decode_frames': lambda: decode_frames(frames_to_bytes(bits, spans), spans),
+        'pipeline': lambda: decodeur.finish_decode(
+            {}, [('CH1', decodeur.decode_capture(temps, signal, sample_rate, DEBIT))], PARAMS, None),
+    }
+
+    if num_samples <= UPLOAD_MAX:
+        contenu = capture_csv(signal, sample_rate)
+        client = decodeur.app.test_client()
+
+        def envoyer(requete=''):
+            # Cache vidé : chaque envoi est réellement décodé
+            decodeur.decode_cache.clear()
+            reponse = client.post('/upload' + requete,
+                                  data={'file': (BytesIO(contenu), 'capture.csv')})
+            if reponse.status_code != 200:
+                raise RuntimeError(reponse.get_json())
+            return reponse
+
+        etapes['upload'] = envoyer
+        etapes['upload_stream'] = lambda: envoyer('?stream=1')
+    return etapes, verifier_trames(signal, sample_rate)
+
+
+def mesurer(fonction, repetitions):
+    """
+    Returns:
+        (meilleur temps en s, pic mémoire en octets, blocs restant alloués)
+    """
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = chrono.perf_counter()
+        fonction()
+        meilleur = min(meilleur, chrono.perf_counter() - debut)
+
+    # Mémoire mesurée à part : tracemalloc ralentit l'exécution
+    tracemalloc.start()
+    avant = tracemalloc.take_snapshot()
+    resultat = fonction()
+    _, pic = tracemalloc.get_traced_memory()
+    apres = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocs = sum(stat.count_diff for stat in apres.compare_to(avant, 'filename') if stat.count_diff > 0)
+    del resultat
+    return meilleur, pic, blocs
+
+
+def executer(tailles, frequences, etapes, repetitions):
+    """
+    Returns:
+        (mesures, captures dont des trames complètes ont un FCS erroné ou
+        dont le seuillage dépend du découpage en blocs : messages)
+    """
+    resultats, erreurs = [], []
+    print(f"{'Étape':<22} | {'Échantillons':>12} | {'Fréq. (Sa/s)':>12} | {'Temps (s)':>10} | "
+          f"{'ns/éch.':>8} | {'Pic (Mo)':>9} | {'Blocs':>8} | Trames (FCS valide)")
+    print('-' * 120)
+    for sample_rate in frequences:
+        for num_samples in tailles:
+            fonctions, (trames, valides, valides_flux, seuillage) = preparer_etapes(num_samples, sample_rate)
+            if min(valides, valides_flux) < trames - 1:
+                erreurs.append(f"{num_samples:,} éch., {sample_rate:.3g} Sa/s : FCS valide pour "
+                               f"{valides} (en mémoire) et {valides_flux} (par blocs) trames sur {trames}")
+            if not seuillage:
+                erreurs.append(f"{num_samples:,} éch., {sample_rate:.3g} Sa/s : seuillage différent "
+                               f"selon le découpage en blocs")
+            for nom in etapes:
+                if nom not in fonctions:
+                    continue
+                duree, pic, blocs = mesurer(fonctions[nom], repetitions)
+                mesure = {
+                    'stage': nom,
+                    'num_samples': num_samples,
+                    'sample_rate': sample_rate,
+                    'seconds': duree,
+                    'ns_per_sample': duree / num_samples * 1e9,
+                    'peak_bytes': pic,
+                    'blocks': blocs,
+                    'frames': trames,
+                    'valid_frames': valides
+                }
+                resultats.append(mesure)
+                print(f"{nom:<22} | {num_samples:>12,} | {sample_rate:>12.3g} | {duree:>10.4f} | "
+                      f"{mesure['ns_per_sample']:>8.2f} | {pic / 1e6:>9.1f} | {blocs:>8,} | {trames} ({valides})")
+    return resultats, erreurs
+
+
+def comparer(resultats, reference, seuil):
+    """
+    Compare les mesures à une référence ; une régression est un temps par
+    échantillon ou un pic mémoire supérieur de plus de seuil (fraction).
+
+    Returns:
+        liste des régressions (messages)
+    """
+    cle = lambda m: (m['stage'], m['num_samples'], m['sample_rate'])
+    anciennes = {cle(m): m for m in reference['results']}
+    regressions = []
+    for mesure in resultats:
+        ancienne = anciennes.get(cle(mesure))
+        if ancienne is None:
+            continue
+        for champ in ('ns_per_sample', 'peak_bytes'):
+            if ancienne[champ] and mesure[champ] > ancienne[champ] * (1 + seuil):
+                regressions.append(
+                    f"{mesure['stage']} ({mesure['num_samples']:,} éch., {mesure['sample_rate']:.3g} Sa/s) : "
+                    f"{champ} {ancienne[champ]:.4g} -> {mesure[champ]:.4g} "
+                    f"(+{(mesure[champ] / ancienne[champ] - 1) * 100:.0f} %)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark du décodage Ethernet')
+    parser.add_argument('--tailles', type=float, nargs='+', default=TAILLES,
+                        help="nombres d'échantillons (10k à 10M par défaut)")
+    parser.add_argument('--frequences', type=float, nargs='+', default=FREQUENCES,
+                        help="fréquences d'échantillonnage en Sa/s")
+    parser.add_argument('--etapes', nargs='+', choices=ETAPES, default=ETAPES)
+    parser.add_argument('--repetitions', type=int, default=3, help='meilleur temps sur n exécutions')
+    parser.add_argument('--sortie', help='enregistrer les mesures (fichier JSON de référence)')
+    parser.add_argument('--reference', help='comparer à une référence enregistrée')
+    parser.add_argument('--seuil', type=float, default=0.10,
+                        help='hausse tolérée avant de signaler une régression (0.10 = 10 %%)')
+    args = parser.parse_args(argv)
+
+    resultats, erreurs = executer([int(t) for t in args.tailles], args.frequences, args.etapes,
+                                  args.repetitions)
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'date': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'machine': platform.platform(),
+                    'repetitions': args.repetitions
+                },
+                'results': resultats
+            }, f, indent=2)
+        print(f'\nMesures enregistrées dans {args.sortie}')
+
+    if erreurs:
+        print(f'\n{len(erreurs)} capture(s) mal décodée(s) :')
+        for message in erreurs:
+            print(f'  - {message}')
+        return 1
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            regressions = comparer(resultats, json.load(f), args.seuil)
+        if regressions:
+            print(f'\n{len(regressions)} régression(s) au-delà de {args.seuil:.0%} :')
+            for message in regressions:
+                print(f'  - {message}')
+            return 1
+        print(f'\nAucune régression au-delà de {args.seuil:.0%} par rapport à {args.reference}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Cache des résultats de décodage
+
+Les résultats (réponse JSON déjà sérialisée, pyramide d'affichage et
+octets des trames, disséquées à la demande) sont rangés sous une clé
+calculée à partir du contenu du fichier et des paramètres de décodage :
+ré-envoyer la même capture ne relance pas le décodage. Le cache en
+mémoire est limité en octets et évince les entrées les moins récemment
+utilisées (LRU) ; un répertoire optionnel sert de second niveau sur
+disque pour les entrées évincées.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from plot_pyramid import PlotPyramid
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def content_hash(stream, block_size=HASH_BLOCK_SIZE):
+    """SHA-256 du contenu d'un flux binaire, lu par blocs ; le flux est ensuite rembobiné"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(block_size), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def cache_key(source, **params):
+    """Clé d'un résultat : empreinte de la source + paramètres de décodage"""
+    description = json.dumps({'source': source, 'params': params}, sort_keys=True)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()[:32]
+
+
+class CacheEntry:
+    """Résultat en cache : réponse JSON sérialisée, pyramide d'affichage et octets des trames"""
+
+    def __init__(self, payload, pyramid, frames=None):
+        self.payload = payload
+        self.pyramid = pyramid
+        self.frames = frames
+        self.nbytes = len(payload) + sum(len(frame) for frame in frames or ())
+        if pyramid is not None:
+            self.nbytes += pyramid.nbytes
+            raw = pyramid.raw
+            if isinstance(raw, np.ndarray) and not isinstance(raw, np.memmap):
+                self.nbytes += raw.nbytes
+
+
+class DecodeCache:
+    """
+    Cache LRU limité à max_bytes octets en mémoire, avec un niveau disque
+    optionnel (disk_dir, limité à max_disk_bytes octets). Les compteurs
+    hits/misses sont disponibles via stats(). Utilisable depuis plusieurs
+    threads.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key, count=True):
+        """Retourne l'entrée de la clé (mémoire puis disque) ou None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return entry
+
+        entry = self._load_from_disk(key)
+        with self._lock:
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            if count:
+                self.disk_hits += 1
+        self._store(key, entry, on_disk=True)
+        return entry
+
+    def put(self, key, payload, pyramid=None, frames=None):
+        """
+        Ajoute un résultat (payload : réponse JSON en bytes, frames : octets
+        de chaque trame) et retourne l'entrée
+        """
+        entry = CacheEntry(payload, pyramid, frames)
+        self._store(key, entry)
+        return entry
+
+    def clear(self):
+        """Vide le cache en mémoire (le niveau disque est conservé)"""
+        with self._lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def _store(self, key, entry, on_disk=False):
+        """
+        Range l'entrée en mémoire ; les entrées évincées sont écrites sur le
+        disque, sauf la clé elle-même si elle en provient (on_disk)
+        """
+        evicted = []
+        with self._lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key).nbytes
+            self.entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes and len(self.entries) > 1:
+                old_key, old_entry = self.entries.popitem(last=False)
+                self.nbytes -= old_entry.nbytes
+                self.evictions += 1
+                evicted.append((old_key, old_entry))
+        for old_key, old_entry in evicted:
+            if not (on_disk and old_key == key):
+                self._save_to_disk(old_key, old_entry)
+
+    def stats(self):
+        """Compteurs du cache"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'disk_dir': str(self.disk_dir) if self.disk_dir else None
+            }
+
+    # Niveau disque : <clé>.json (réponse) et <clé>.npz (pyramide sans le
+    # signal brut, octets des trames concaténés avec leurs positions)
+
+    def _save_to_disk(self, key, entry):
+        if self.disk_dir is None:
+            return
+        (self.disk_dir / f'{key}.json').write_bytes(entry.payload)
+        arrays = entry.pyramid.to_arrays() if entry.pyramid is not None else {}
+        if entry.frames is not None:
+            arrays['frames_data'] = np.frombuffer(b''.join(entry.frames), dtype=np.uint8)
+            arrays['frames_offsets'] = np.cumsum([0] + [len(frame) for frame in entry.frames])
+        if arrays:
+            with open(self.disk_dir / f'{key}.npz', 'wb') as f:
+                np.savez(f, **arrays)
+        self._trim_disk()
+
+    def _load_from_disk(self, key):
+        if self.disk_dir is None:
+            return None
+        json_path = self.disk_dir / f'{key}.json'
+        if not json_path.exists():
+            return None
+        npz_path = self.disk_dir / f'{key}.npz'
+        pyramid = frames = None
+        if npz_path.exists():
+            with np.load(npz_path) as arrays:
+                if 'params' in arrays:
+                    pyramid = PlotPyramid.from_arrays(arrays)
+                if 'frames_data' in arrays:
+                    data = arrays['frames_data'].tobytes()
+                    offsets = arrays['frames_offsets'].tolist()
+                    frames = [data[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        os.utime(json_path)
+        return CacheEntry(json_path.read_bytes(), pyramid, frames)
+
+    def _trim_disk(self):
+        """Supprime les fichiers les plus anciens au-delà de max_disk_bytes"""
+        if self.max_disk_bytes is None:
+            return
+        files = sorted(self.disk_dir.glob('*.json'), key=lambda p: p.stat().st_mtime)
+        sizes = {p: p.stat().st_size + (p.with_suffix('.npz').stat().st_size
+                                        if p.with_suffix('.npz').exists() else 0)
+                 for p in files}
+        total = sum(sizes.values())
+        for path in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= sizes[path]
+            path.unlink(missing_ok=True)
+            path.with_suffix('.npz').unlink(missing_ok=True)
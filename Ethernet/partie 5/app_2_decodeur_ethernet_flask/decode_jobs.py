@@ -0,0 +1,180 @@
+"""
+Travaux de décodage asynchrones
+
+Le décodage d'une capture est soumis à un pool de processus (un par cœur)
+au lieu d'occuper le thread de la requête HTTP. Chaque travail publie son
+avancement (étape et fraction) dans un dictionnaire partagé, lu par les
+routes de suivi. Le nombre de travaux en attente est borné et un travail
+peut être annulé : retiré de la file s'il n'a pas démarré, sinon arrêté
+à la prochaine étape.
+"""
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+MAX_FINISHED_JOBS = 256  # Travaux terminés dont on garde l'état
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+CANCELLED = 'cancelled'
+FINAL_STATES = (DONE, ERROR, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Levée dans le processus de travail quand le travail a été annulé"""
+
+
+class QueueFull(Exception):
+    """Trop de travaux en attente ou en cours"""
+
+
+class ProgressReporter:
+    """
+    Transmis à la fonction exécutée dans le pool : publie l'étape en cours
+    et vérifie à chaque appel si le travail a été annulé.
+    """
+
+    def __init__(self, job_id, progress, cancel_flags):
+        self.job_id = job_id
+        self.progress = progress
+        self.cancel_flags = cancel_flags
+
+    def stage(self, name, fraction=0.0):
+        if self.cancel_flags.get(self.job_id):
+            raise JobCancelled()
+        self.progress[self.job_id] = {'stage': name, 'fraction': round(float(fraction), 3)}
+
+
+class Job:
+    def __init__(self, job_id, cleanup=None):
+        self.id = job_id
+        self.status = QUEUED
+        self.created = time.time()
+        self.finished = None
+        self.result_id = None
+        self.error = None
+        self.future = None
+        self.cleanup = cleanup
+
+
+class JobManager:
+    """
+    Pool de processus exécutant target(reporter, *args).
+
+    Args:
+        target: fonction de travail (niveau module, pour être transmise au pool)
+        on_done: appelée dans le processus principal avec le résultat de
+            target, doit retourner l'identifiant du résultat (result_id)
+        max_workers: nombre de processus (nombre de cœurs par défaut)
+        max_pending: nombre maximal de travaux en attente ou en cours
+        initializer: fonction exécutée au démarrage de chaque processus
+    """
+
+    def __init__(self, target, on_done, max_workers=None, max_pending=None, initializer=None):
+        self.target = target
+        self.on_done = on_done
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.initializer = initializer
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._cancel_flags = None
+
+    def _start(self):
+        # Démarrage à la demande : pas de processus créés à l'import du module
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+            self._cancel_flags = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 initializer=self.initializer)
+
+    def pending_count(self):
+        return sum(1 for job in self.jobs.values() if job.status in (QUEUED, RUNNING))
+
+    def submit(self, *args, cleanup=None):
+        """
+        Soumet un travail ; cleanup est appelée quand il se termine (quel que
+        soit le résultat). Lève QueueFull si la file est pleine.
+        """
+        with self._lock:
+            if self.pending_count() >= self.max_pending:
+                raise QueueFull()
+            self._start()
+            job = Job(uuid.uuid4().hex, cleanup)
+            self.jobs[job.id] = job
+            self._progress[job.id] = {'stage': QUEUED, 'fraction': 0.0}
+            reporter = ProgressReporter(job.id, self._progress, self._cancel_flags)
+            job.future = self._executor.submit(self.target, reporter, *args)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def finish_now(self, result_id):
+        """Enregistre un travail déjà terminé (résultat disponible sans calcul)"""
+        with self._lock:
+            job = Job(uuid.uuid4().hex)
+            job.status, job.finished, job.result_id = DONE, time.time(), result_id
+            self.jobs[job.id] = job
+            self._forget_old_jobs()
+        return job
+
+    def _finish(self, job, future):
+        try:
+            if future.cancelled():
+                job.status = CANCELLED
+            else:
+                job.result_id = self.on_done(future.result())
+                job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = ERROR
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            if job.cleanup:
+                job.cleanup()
+            with self._lock:
+                self._progress.pop(job.id, None)
+                self._cancel_flags.pop(job.id, None)
+                self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINAL_STATES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id):
+        """État d'un travail (dict) ou None s'il est inconnu"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        state = {'job_id': job.id, 'status': job.status, 'result_id': job.result_id}
+        if job.status in (QUEUED, RUNNING):
+            progress = self._progress.get(job.id) or {}
+            if progress.get('stage', QUEUED) != QUEUED:
+                job.status = state['status'] = RUNNING
+            state.update(progress)
+        if job.error:
+            state['error'] = job.error
+        state['elapsed'] = round((job.finished or time.time()) - job.created, 3)
+        return state
+
+    def cancel(self, job_id):
+        """Annule un travail ; retourne False s'il est inconnu ou déjà terminé"""
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINAL_STATES:
+            return False
+        if not job.future.cancel():
+            # Déjà démarré : arrêt à la prochaine étape signalée
+            self._cancel_flags[job_id] = True
+        return True
@@ -0,0 +1,138 @@
+"""
+Métriques du service de décodage
+
+Les mesures des étapes de chaque requête (chronometrage.StageRecorder)
+sont renvoyées au client dans l'en-tête Server-Timing et cumulées dans
+des histogrammes de latence (par route et par étape), servis au format
+texte de Prometheus par la route /metrics.
+"""
+import bisect
+import threading
+
+# Bornes des histogrammes de durée (s)
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label(name, value):
+    value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'{name}="{value}"'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogramme de valeurs, une série par valeur de l'étiquette label"""
+
+    def __init__(self, name, description, label, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.series = {}  # valeur de l'étiquette -> [comptes par borne (+ dépassement), somme]
+
+    def observe(self, label_value, value):
+        series = self.series.get(label_value)
+        if series is None:
+            series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label_value, (counts, total) in sorted(self.series.items()):
+            label = _label(self.label, label_value)
+            cumulated = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulated += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulated}')
+            lines.append(f'{self.name}_sum{{{label}}} {_number(total)}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulated}')
+        return lines
+
+
+class LabeledValues:
+    """Compteur ou jauge (kind), une valeur par valeur de l'étiquette label"""
+
+    def __init__(self, name, description, label, kind='counter'):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.kind = kind
+        self.values = {}
+
+    def add(self, label_value, value):
+        self.values[label_value] = self.values.get(label_value, 0) + value
+
+    def maximum(self, label_value, value):
+        self.values[label_value] = max(self.values.get(label_value, value), value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+        for label_value, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{{{_label(self.label, label_value)}}} {_number(value)}')
+        return lines
+
+
+class DecoderMetrics:
+    """Métriques cumulées des requêtes ; utilisable depuis plusieurs threads"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.request_duration = Histogram(
+            'decoder_request_duration_seconds', 'Durée des requêtes par route', 'endpoint', buckets)
+        self.stage_duration = Histogram(
+            'decoder_stage_duration_seconds', 'Durée des étapes du décodage par requête', 'stage', buckets)
+        self.stage_samples = LabeledValues(
+            'decoder_stage_samples_total', 'Échantillons traités par étape', 'stage')
+        self.stage_peak = LabeledValues(
+            'decoder_stage_peak_bytes', "Pic d'allocation maximal par étape (requêtes profilées)",
+            'stage', kind='gauge')
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, recorder, seconds):
+        """
+        Ajoute une requête : durée totale et étapes de recorder. Les pics
+        d'allocation sont retenus ; les durées des requêtes profilées,
+        ralenties par tracemalloc, ne sont pas comptées.
+        """
+        with self._lock:
+            for timing in recorder.stages.values():
+                if timing.peak_bytes is not None:
+                    self.stage_peak.maximum(timing.name, timing.peak_bytes)
+            if recorder.profile:
+                return
+            self.request_duration.observe(endpoint, seconds)
+            for timing in recorder.stages.values():
+                self.stage_duration.observe(timing.name, timing.seconds)
+                if timing.samples:
+                    self.stage_samples.add(timing.name, timing.samples)
+
+    def render(self):
+        """Métriques au format texte de Prometheus"""
+        with self._lock:
+            lines = []
+            for metric in (self.request_duration, self.stage_duration, self.stage_samples, self.stage_peak):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def server_timing(recorder, total):
+    """
+    Valeur de l'en-tête Server-Timing : une entrée par étape (durée en ms,
+    échantillons et pic d'allocation en description) et la durée totale
+    """
+    entries = []
+    for timing in recorder.stages.values():
+        entry = f'{timing.name};dur={timing.seconds * 1e3:.3f}'
+        details = []
+        if timing.samples:
+            details.append(f'{timing.samples} samples')
+        if timing.peak_bytes is not None:
+            details.append(f'peak {timing.peak_bytes / 1e6:.1f} MB')
+        if details:
+            entry += f';desc="{", ".join(details)}"'
+        entries.append(entry)
+    entries.append(f'total;dur={total * 1e3:.3f}')
+    return ', '.join(entries)
@@ -0,0 +1,240 @@
+"""
+Pyramide multi-résolution (min/max) pour l'affichage des captures
+
+Le signal est résumé par paquets d'échantillons : pour chaque paquet on
+garde le minimum et le maximum, ce qui conserve l'enveloppe du signal
+(fronts et parasites restent visibles, contrairement à un simple
+sous-échantillonnage). Chaque niveau regroupe deux paquets du niveau
+précédent. Une fenêtre de temps est ensuite servie au niveau le plus fin
+qui tient dans le nombre de points demandé.
+
+Le niveau le plus fin est limité à MAX_BUCKETS paquets : au-delà, ses
+paquets sont regroupés deux à deux pendant la construction (la taille
+de paquet double), si bien que la mémoire de la pyramide ne dépend pas
+de la taille de la capture ; les zooms plus fins que ce niveau utilisent
+le signal brut s'il est disponible.
+
+La trace numérique est celle du décodage (niveaux produits par le
+seuillage à hystérésis) : chaque paquet garde un octet d'état indiquant
+s'il contient des échantillons au niveau haut (HIGH) et au niveau bas
+(LOW), et les zooms sur le signal brut utilisent les fronts décodés.
+"""
+import numpy as np
+
+BASE_BUCKET = 16  # Échantillons par paquet au niveau le plus fin
+MAX_BUCKETS = 1 << 20  # Paquets gardés au plus au niveau le plus fin (~9 Mo)
+MAX_POINTS = 2000
+
+# Octet d'état d'un paquet (bits combinés par OU d'un niveau au suivant)
+HIGH = 1  # Au moins un échantillon au niveau haut
+LOW = 2  # Au moins un échantillon au niveau bas
+
+
+class PlotPyramid:
+    """
+    Pyramide min/max d'un signal échantillonné régulièrement
+    (t = t_first + i * sample_interval).
+
+    Le signal peut être fourni d'un bloc ou par morceaux (méthode feed,
+    utilisée par le décodage en flux), puis finish() construit les niveaux ;
+    bucket double chaque fois que le niveau le plus fin dépasse max_buckets
+    paquets (None : pas de limite).
+    Si raw est fourni (tableau ou np.memmap du signal complet), les fenêtres
+    assez étroites sont servies avec les échantillons bruts ; raw_edges
+    (fronts du signal numérique décodé, positions triées) donne alors leur
+    trace numérique. Sans niveaux décodés, la trace numérique est la
+    comparaison du signal à threshold.
+    """
+
+    def __init__(self, t_first, sample_interval, threshold, bucket=BASE_BUCKET, raw=None, raw_edges=None,
+                 max_buckets=MAX_BUCKETS):
+        self.t_first = float(t_first)
+        self.sample_interval = float(sample_interval)
+        self.threshold = float(threshold)
+        self.bucket = bucket
+        self.max_buckets = max_buckets
+        self.raw = raw
+        self.raw_edges = raw_edges
+        self.raw_first_level = None  # Niveau numérique du premier échantillon
+        self.num_samples = 0
+        self.levels = []  # [(mins, maxs, états), ...], paquets de bucket * 2**k échantillons
+        self._mins = []
+        self._maxs = []
+        self._states = []
+        self._num_buckets = 0  # Paquets complets dans _mins, _maxs et _states
+        self._carry = np.empty(0, dtype=np.float32)
+        self._carry_digital = np.empty(0, dtype=np.uint8)
+
+    def feed(self, signal, digital=None):
+        """
+        Ajoute un morceau du signal et ses niveaux numériques décodés (uint8,
+        comparaison à threshold si None) ; les paquets incomplets sont reportés
+        """
+        signal = np.asarray(signal, dtype=np.float32)
+        if digital is None:
+            digital = (signal > self.threshold).view(np.uint8)
+        if self.num_samples == 0 and len(digital):
+            self.raw_first_level = int(digital[0])
+        self.num_samples += len(signal)
+        if len(self._carry):
+            signal = np.concatenate((self._carry, signal))
+            digital = np.concatenate((self._carry_digital, digital))
+        full = len(signal) // self.bucket * self.bucket
+        if full:
+            buckets = signal[:full].reshape(-1, self.bucket)
+            self._mins.append(buckets.min(axis=1))
+            self._maxs.append(buckets.max(axis=1))
+            self._states.append(self._bucket_states(digital[:full].reshape(-1, self.bucket)))
+            self._num_buckets += full // self.bucket
+        self._carry = signal[full:]
+        self._carry_digital = digital[full:]
+        # Nombre impair de paquets : regroupement au prochain morceau
+        while self.max_buckets and self._num_buckets > self.max_buckets and self._num_buckets % 2 == 0:
+            self._coarsen()
+
+    def _coarsen(self):
+        """Regroupe deux à deux les paquets du niveau le plus fin (paquets deux fois plus grands)"""
+        mins, maxs, states = (np.concatenate(parts) for parts in (self._mins, self._maxs, self._states))
+        self._mins = [mins.reshape(-1, 2).min(axis=1)]
+        self._maxs = [maxs.reshape(-1, 2).max(axis=1)]
+        self._states = [np.bitwise_or.reduce(states.reshape(-1, 2), axis=1)]
+        self._num_buckets //= 2
+        self.bucket *= 2
+
+    @staticmethod
+    def _bucket_states(digital):
+        """Octet d'état (HIGH | LOW) de chaque ligne de digital"""
+        return (digital.max(axis=1) * HIGH) | ((1 - digital.min(axis=1)) * LOW)
+
+    def finish(self):
+        """Construit tous les niveaux de la pyramide"""
+        if len(self._carry):
+            self._mins.append(self._carry.min(keepdims=True))
+            self._maxs.append(self._carry.max(keepdims=True))
+            self._states.append(self._bucket_states(self._carry_digital[None, :]))
+        self._carry = np.empty(0, dtype=np.float32)
+        self._carry_digital = np.empty(0, dtype=np.uint8)
+
+        mins = np.concatenate(self._mins) if self._mins else np.empty(0, dtype=np.float32)
+        maxs = np.concatenate(self._maxs) if self._maxs else np.empty(0, dtype=np.float32)
+        states = np.concatenate(self._states) if self._states else np.empty(0, dtype=np.uint8)
+        self._mins, self._maxs, self._states = [], [], []
+        self._num_buckets = 0
+        self.levels = [(mins, maxs, states)]
+        while len(mins) > 1:
+            if len(mins) % 2:
+                mins = np.append(mins, mins[-1])
+                maxs = np.append(maxs, maxs[-1])
+                states = np.append(states, states[-1])
+            mins = mins.reshape(-1, 2).min(axis=1)
+            maxs = maxs.reshape(-1, 2).max(axis=1)
+            states = np.bitwise_or.reduce(states.reshape(-1, 2), axis=1)
+            self.levels.append((mins, maxs, states))
+        return self
+
+    def to_arrays(self):
+        """Niveau le plus fin et paramètres, pour l'enregistrement (np.savez)"""
+        mins, maxs, states = self.levels[0]
+        return {
+            'mins': mins,
+            'maxs': maxs,
+            'states': states,
+            'params': np.array([self.t_first, self.sample_interval, self.threshold,
+                                self.bucket, self.num_samples])
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Reconstruit une pyramide (sans signal brut) à partir de to_arrays() ;
+        sans 'states' (fichiers plus anciens), états déduits de threshold
+        """
+        t_first, sample_interval, threshold, bucket, num_samples = arrays['params'].tolist()
+        pyramid = cls(t_first, sample_interval, threshold, int(bucket), max_buckets=None)
+        pyramid.num_samples = int(num_samples)
+        mins, maxs = arrays['mins'], arrays['maxs']
+        pyramid._mins = [mins]
+        pyramid._maxs = [maxs]
+        if 'states' in arrays:
+            pyramid._states = [arrays['states']]
+        else:
+            pyramid._states = [((maxs > threshold) * HIGH | (mins <= threshold) * LOW).astype(np.uint8)]
+        return pyramid.finish()
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par les niveaux et les fronts (hors signal brut)"""
+        edges = self.raw_edges.nbytes if self.raw_edges is not None else 0
+        return edges + sum(sum(array.nbytes for array in level) for level in self.levels)
+
+    def window(self, start=None, end=None, points=MAX_POINTS):
+        """
+        Retourne les points d'une fenêtre [start, end] (secondes, toute la
+        capture si None) avec au plus environ points valeurs.
+
+        Returns:
+            dict avec 'time', 'analog', 'digital' (listes) et 'bucket'
+            (échantillons par point, 1 = échantillons bruts)
+        """
+        arrays = self.window_arrays(start, end, points)
+        times = arrays['time_start'] + np.arange(len(arrays['analog'])) * arrays['time_step']
+        return {
+            'time': times.tolist(),
+            'analog': arrays['analog'].tolist(),
+            'digital': arrays['digital'].tolist(),
+            'bucket': arrays['bucket']
+        }
+
+    def window_arrays(self, start=None, end=None, points=MAX_POINTS):
+        """
+        Comme window, sous forme de tableaux NumPy : 'analog' (float32),
+        'digital' (uint8) et, les points étant régulièrement espacés, leur
+        base de temps 'time_start' + k * 'time_step' au lieu des instants
+        """
+        i0 = 0 if start is None else int(np.floor((start - self.t_first) / self.sample_interval))
+        i1 = self.num_samples if end is None else int(np.ceil((end - self.t_first) / self.sample_interval)) + 1
+        i0, i1 = max(i0, 0), min(i1, self.num_samples)
+        if i1 <= i0:
+            return {'analog': np.empty(0, dtype=np.float32), 'digital': np.empty(0, dtype=np.uint8),
+                    'time_start': self.t_first, 'time_step': self.sample_interval, 'bucket': 1}
+
+        if self.raw is not None and i1 - i0 <= points:
+            values = np.asarray(self.raw[i0:i1], dtype=np.float32)
+            if self.raw_edges is not None and self.raw_first_level is not None:
+                # Niveau d'un échantillon : premier niveau changé à chaque front qui le précède
+                changes = np.searchsorted(self.raw_edges, np.arange(i0, i1), side='left')
+                digital = ((changes & 1) ^ self.raw_first_level).astype(np.uint8)
+            else:
+                digital = (values > self.threshold).view(np.uint8)
+            return {
+                'analog': values,
+                'digital': digital,
+                'time_start': self.t_first + i0 * self.sample_interval,
+                'time_step': self.sample_interval,
+                'bucket': 1
+            }
+
+        # Niveau le plus fin donnant au plus points valeurs (2 par paquet)
+        level = 0
+        while level < len(self.levels) - 1 and (i1 - i0) / (self.bucket << level) > points / 2:
+            level += 1
+        size = self.bucket << level
+        mins, maxs, states = self.levels[level]
+        b0, b1 = i0 // size, min(-(-i1 // size), len(mins))
+
+        # Min au début du paquet, max en son milieu : l'enveloppe est tracée en
+        # zigzag ; de même pour la trace numérique (bas s'il y a un niveau bas,
+        # puis haut s'il y a un niveau haut)
+        values = np.empty(2 * (b1 - b0), dtype=np.float32)
+        values[0::2] = mins[b0:b1]
+        values[1::2] = maxs[b0:b1]
+        digital = np.empty(2 * (b1 - b0), dtype=np.uint8)
+        digital[0::2] = (states[b0:b1] & LOW) == 0
+        digital[1::2] = (states[b0:b1] & HIGH) != 0
+        return {
+            'analog': values,
+            'digital': digital,
+            'time_start': self.t_first + b0 * size * self.sample_interval,
+            'time_step': size * self.sample_interval / 2,
+            'bucket': size
+        }
@@ -0,0 +1,83 @@
+"""
+Transport binaire de tableaux numériques
+
+Alternative compacte au JSON pour les longues séries (points des
+graphiques) : un en-tête JSON décrit les tableaux, qui suivent tels quels
+en little-endian et sont lus côté client comme des tableaux typés
+JavaScript (Float32Array, Uint8Array...) sans aucune conversion.
+
+Format :
+    MAGIC (4 octets) | longueur de l'en-tête (uint32 little-endian)
+    | en-tête JSON (UTF-8, complété par des espaces)
+    | tableaux, chacun aligné sur 8 octets
+
+L'en-tête contient les champs fournis et 'arrays' : nom -> {'dtype',
+'offset' (depuis le début du message), 'length' (nombre d'éléments)}.
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'ETHA'
+MIMETYPE = 'application/vnd.ethernet-decoder.arrays'
+ALIGNMENT = 8
+
+# Types transportés : nom côté client (tableau typé) -> dtype little-endian
+DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8'),
+    'uint8': np.dtype('u1'),
+    'int32': np.dtype('<i4'),
+    'uint32': np.dtype('<u4'),
+}
+
+
+def _padding(size):
+    return -size % ALIGNMENT
+
+
+def encode_arrays(header, arrays):
+    """
+    Message binaire : header (dict sérialisable en JSON) et arrays (nom ->
+    tableau NumPy d'un des types de DTYPES, converti en little-endian)
+    """
+    converted, layout = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        dtype_name = array.dtype.name
+        if dtype_name not in DTYPES:
+            raise ValueError(f"Type non transportable pour {name} : {dtype_name}")
+        converted.append((name, dtype_name, array.astype(DTYPES[dtype_name], copy=False)))
+
+    # La position des tableaux dépend de la longueur de l'en-tête, qui
+    # contient ces positions : on la calcule avec des positions provisoires
+    # de même largeur, puis on complète l'en-tête par des espaces
+    def describe(start):
+        offset = start
+        for name, dtype_name, array in converted:
+            layout[name] = {'dtype': dtype_name, 'offset': offset, 'length': len(array)}
+            offset += array.nbytes + _padding(array.nbytes)
+        return json.dumps(dict(header, arrays=layout), separators=(',', ':')).encode('utf-8')
+
+    guess = describe(10 ** 12)  # Largeur maximale des positions
+    start = 8 + len(guess) + _padding(8 + len(guess))
+    header_bytes = describe(start)
+    header_bytes += b' ' * (start - 8 - len(header_bytes))
+
+    parts = [MAGIC, struct.pack('<I', len(header_bytes)), header_bytes]
+    for _, _, array in converted:
+        parts.append(array.tobytes())
+        parts.append(b'\0' * _padding(array.nbytes))
+    return b''.join(parts)
+
+
+def decode_arrays(payload):
+    """Inverse de encode_arrays : (en-tête sans 'arrays', dict nom -> tableau NumPy)"""
+    if payload[:4] != MAGIC:
+        raise ValueError("Message binaire invalide")
+    (header_length,) = struct.unpack_from('<I', payload, 4)
+    header = json.loads(payload[8:8 + header_length])
+    arrays = {name: np.frombuffer(payload, DTYPES[spec['dtype']], spec['length'], spec['offset'])
+              for name, spec in header.pop('arrays').items()}
+    return header, arrays